@@ -0,0 +1,154 @@
+"""Hot/cold tiering: fraud_cases size, historical aggregation and insert latency before/after archival.
+
+Usage:
+    DB_URL=sqlite:///bench_archive.db python benchmarks/archive_benchmark.py [--rows 1000000] [--days 365]
+
+Loads synthetic cases spread over the last ``--days`` days and rebuilds the rollups. It then
+times a historical GROUP BY straight from fraud_cases, a rollup rebuild of the old days, and
+500-row inserts. Next it moves rows older than ``--archive-after-days`` into a Parquet archive
+(``archive.py``) and times the same work again, this time aggregating archived days from the
+archive. It also checks that ``report_stats`` for the archived days is unchanged after
+archival and a rebuild from the archive.
+The tables are dropped and recreated.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from archive import CaseArchive  # noqa: E402
+from fraud_cases_store import insert_fraud_cases, malaysia_now  # noqa: E402
+from migrations import migrate  # noqa: E402
+from rollups import rebuild_rollups, report_stats  # noqa: E402
+from synthetic import ACCOUNT_TYPES, COUNTRIES, PAYMENT_METHODS, RISK_LEVELS, RISK_WEIGHTS  # noqa: E402
+
+INSERT_BATCH = 20000
+
+
+def synthetic_rows(rng, n, now, days):
+    deposits = rng.integers(100, 50000, n)
+    offsets = np.sort(rng.integers(0, days * 24 * 3600, n))[::-1]
+    return [{
+        "client_id": f"C{client:06d}",
+        "detection_timestamp": (now - timedelta(seconds=int(offset))).strftime("%Y-%m-%d %H:%M:%S"),
+        "country": COUNTRIES[country], "account_type": ACCOUNT_TYPES[account],
+        "deposit_amount": int(deposit), "withdrawal_amount": int(withdrawal), "num_trades": int(trades),
+        "avg_trade_amount": int(avg_trade), "trade_duration": int(duration), "total_profit": int(profit),
+        "fees_paid": float(fees), "payment_method": PAYMENT_METHODS[payment], "risk_level": RISK_LEVELS[risk],
+        "model_version": None,
+    } for client, offset, country, account, deposit, withdrawal, trades, avg_trade, duration, profit, fees,
+        payment, risk in zip(
+        rng.integers(1, 200000, n), offsets, rng.integers(0, len(COUNTRIES), n),
+        rng.integers(0, len(ACCOUNT_TYPES), n), deposits, rng.integers(0, deposits), rng.integers(0, 50, n),
+        rng.integers(1, 1000, n), rng.integers(1, 600, n), rng.integers(-5000, 10000, n),
+        np.round(deposits * rng.uniform(0.001, 0.02, n), 2), rng.integers(0, len(PAYMENT_METHODS), n),
+        rng.choice(len(RISK_LEVELS), n, p=RISK_WEIGHTS))]
+
+
+def load(engine, rows, days, now):
+    with engine.connect() as conn:
+        for table in ("fraud_cases", "fraud_case_rollups", "llm_summary_cache", "schema_migrations"):
+            conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        conn.commit()
+    migrate(engine)
+    rng = np.random.default_rng(42)
+    columns = list(synthetic_rows(rng, 1, now, days)[0])
+    insert_sql = text(f"INSERT INTO fraud_cases ({', '.join(columns)}) VALUES ({', '.join(':' + c for c in columns)})")
+    with engine.connect() as conn:
+        for loaded in range(0, rows, INSERT_BATCH):
+            conn.execute(insert_sql, synthetic_rows(rng, min(INSERT_BATCH, rows - loaded), now, days))
+            conn.commit()
+            print(f"\r  loaded {min(loaded + INSERT_BATCH, rows):,}/{rows:,} rows", end="", flush=True)
+        rebuild_rollups(conn)
+        conn.commit()
+    print()
+
+
+def timed(fn, repeat=1):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def measure(engine, archive, start_day, end_day, now):
+    rng = np.random.default_rng(7)
+    results = {}
+    with engine.connect() as conn:
+        results["fraud_cases rows"] = conn.execute(text("SELECT COUNT(*) FROM fraud_cases")).scalar()
+
+        def historical_aggregate():
+            conn.execute(text("""
+                SELECT risk_level, country, payment_method, COUNT(*), SUM(deposit_amount), SUM(withdrawal_amount)
+                FROM fraud_cases WHERE detection_timestamp >= :start AND detection_timestamp < :end
+                GROUP BY risk_level, country, payment_method
+            """), {"start": start_day, "end": end_day}).fetchall()
+            if archive is not None:
+                archive.rollup_groups(start_day, end_day)
+
+        def rebuild_old_days():
+            rebuild_rollups(conn, start_day, end_day, archive)
+            conn.commit()
+
+        def insert_500():
+            insert_fraud_cases(conn, synthetic_rows(rng, 500, now, 1))
+            conn.commit()
+
+        results["historical aggregate (ms)"] = timed(historical_aggregate, 5)
+        results["rollup rebuild of old days (ms)"] = timed(rebuild_old_days, 3)
+        results["insert 500 rows (ms)"] = timed(insert_500, 10)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--archive-after-days", type=int, default=30)
+    parser.add_argument("--archive-dir", help="Archive directory (default: a temporary directory)")
+    args = parser.parse_args()
+
+    engine = create_engine(os.environ.get("DB_URL", "sqlite:///bench_archive.db"))
+    now = datetime.strptime(malaysia_now(), "%Y-%m-%d %H:%M:%S")
+    print(f"Building synthetic fraud_cases ({args.rows:,} rows over {args.days} days) on {engine.dialect.name}")
+    load(engine, args.rows, args.days, now)
+
+    start_day = (now - timedelta(days=args.days)).strftime("%Y-%m-%d")
+    end_day = (now - timedelta(days=args.archive_after_days + 1)).strftime("%Y-%m-%d")
+    with engine.connect() as conn:
+        stats_before = report_stats(conn, start_day, end_day)
+    before = measure(engine, None, start_day, end_day, now)
+
+    archive_dir = args.archive_dir or tempfile.mkdtemp(prefix="fraud_archive_")
+    archive = CaseArchive(archive_dir)
+    start = time.perf_counter()
+    moved = archive.archive_old_cases(engine, args.archive_after_days)
+    print(f"Archived {moved:,} rows in {time.perf_counter() - start:.1f}s "
+          f"({archive.stats()['bytes'] / 1e6:.1f} MB of Parquet in {archive.stats()['partitions']} partitions)")
+
+    after = measure(engine, archive, start_day, end_day, now)  # Includes rebuilding the old days from the archive
+    with engine.connect() as conn:
+        unchanged = report_stats(conn, start_day, end_day) == stats_before
+
+    print(f"\n{'':<34} {'hot only':>14} {'hot + archive':>14}")
+    for label in before:
+        print(f"{label:<34} {before[label]:>14,.2f} {after[label]:>14,.2f}")
+    print(f"\n{'✅' if unchanged else '❌'} report_stats for the archived days "
+          f"{'match' if unchanged else 'differ'} after archival and rebuild")
+    if not args.archive_dir:
+        shutil.rmtree(archive_dir)
+
+
+if __name__ == "__main__":
+    main()
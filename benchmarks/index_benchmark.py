@@ -0,0 +1,146 @@
+"""Query latency before/after the fraud_cases index migration.
+
+Usage:
+    DB_URL=sqlite:///bench_index.db python benchmarks/index_benchmark.py [--rows 3000000]
+
+Builds a synthetic fraud_cases table (schema migrations 1-2 only, i.e. primary key
+only), times the hot read queries, applies migration 3 (composite indexes) and times
+them again. Point DB_URL at a scratch MySQL schema to measure production behaviour;
+the default is a local SQLite file. The table is dropped and recreated.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from migrations import MIGRATIONS, migrate  # noqa: E402
+from synthetic import ACCOUNT_TYPES, COUNTRIES, PAYMENT_METHODS, RISK_LEVELS, RISK_WEIGHTS  # noqa: E402
+
+INSERT_BATCH = 20000
+
+
+def day_range(rng, days):
+    first = int(rng.integers(1, 32 - days))
+    return {"start": f"2025-01-{first:02d}", "end": f"2025-01-{first + days:02d}"}
+
+
+QUERIES = {
+    "generate_summary (latest row for a client)": (
+        "SELECT * FROM fraud_cases WHERE client_id = :client_id ORDER BY id DESC LIMIT 1",
+        lambda rng, clients: {"client_id": f"C{rng.integers(1, clients):06d}"},
+    ),
+    "generate_report (1-day range scan)": (
+        "SELECT COUNT(*), SUM(deposit_amount) FROM fraud_cases "
+        "WHERE detection_timestamp >= :start AND detection_timestamp < :end",
+        lambda rng, clients: day_range(rng, 1),
+    ),
+    "High Risk in a 3-day range": (
+        "SELECT id, client_id FROM fraud_cases WHERE risk_level = 'High Risk' "
+        "AND detection_timestamp >= :start AND detection_timestamp < :end",
+        lambda rng, clients: day_range(rng, 3),
+    ),
+}
+
+
+def reset_schema(engine):
+    with engine.connect() as conn:
+        for table in ("fraud_cases", "fraud_case_rollups", "schema_migrations"):
+            conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        conn.commit()
+    migrate(engine, target_version=max(v for v, _, _ in MIGRATIONS if v < 3))
+
+
+def load_synthetic_rows(engine, rows, clients, seed=42):
+    """Bulk-loads rows spread over January 2025 (the notebook's feature distributions)."""
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2025-01-01T00:00:00")
+    insert_sql = text("""
+        INSERT INTO fraud_cases (client_id, detection_timestamp, country, account_type, deposit_amount,
+                                 withdrawal_amount, num_trades, avg_trade_amount, trade_duration,
+                                 total_profit, fees_paid, payment_method, risk_level)
+        VALUES (:client_id, :detection_timestamp, :country, :account_type, :deposit_amount,
+                :withdrawal_amount, :num_trades, :avg_trade_amount, :trade_duration,
+                :total_profit, :fees_paid, :payment_method, :risk_level)
+    """)
+    loaded = 0
+    with engine.connect() as conn:
+        while loaded < rows:
+            n = min(INSERT_BATCH, rows - loaded)
+            deposits = rng.integers(100, 50000, n)
+            timestamps = np.sort(start + rng.integers(0, 31 * 24 * 3600, n).astype("timedelta64[s]"))
+            batch = [{
+                "client_id": f"C{client:06d}",
+                "detection_timestamp": str(ts).replace("T", " "),
+                "country": COUNTRIES[country],
+                "account_type": ACCOUNT_TYPES[account],
+                "deposit_amount": int(deposit),
+                "withdrawal_amount": int(withdrawal),
+                "num_trades": int(trades),
+                "avg_trade_amount": int(avg_trade),
+                "trade_duration": int(duration),
+                "total_profit": int(profit),
+                "fees_paid": float(fees),
+                "payment_method": PAYMENT_METHODS[payment],
+                "risk_level": RISK_LEVELS[risk],
+            } for client, ts, country, account, deposit, withdrawal, trades, avg_trade, duration, profit, fees,
+                payment, risk in zip(
+                rng.integers(1, clients, n), timestamps, rng.integers(0, len(COUNTRIES), n),
+                rng.integers(0, len(ACCOUNT_TYPES), n), deposits, rng.integers(0, deposits),
+                rng.integers(0, 50, n), rng.integers(1, 1000, n), rng.integers(1, 600, n),
+                rng.integers(-5000, 10000, n), np.round(deposits * rng.uniform(0.001, 0.02, n), 2),
+                rng.integers(0, len(PAYMENT_METHODS), n), rng.choice(len(RISK_LEVELS), n, p=RISK_WEIGHTS))]
+            conn.execute(insert_sql, batch)
+            conn.commit()
+            loaded += n
+            print(f"\r  loaded {loaded:,}/{rows:,} rows", end="", flush=True)
+    print()
+
+
+def time_queries(engine, clients, repeat):
+    rng = np.random.default_rng(7)
+    results = {}
+    with engine.connect() as conn:
+        for label, (sql, make_params) in QUERIES.items():
+            conn.execute(text(sql), make_params(rng, clients)).fetchall()  # Warm-up
+            timings = []
+            for _ in range(repeat):
+                params = make_params(rng, clients)
+                start = time.perf_counter()
+                conn.execute(text(sql), params).fetchall()
+                timings.append((time.perf_counter() - start) * 1000)
+            results[label] = (statistics.median(timings), max(timings))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=3000000)
+    parser.add_argument("--clients", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine(os.environ.get("DB_URL", "sqlite:///bench_index.db"))
+    print(f"Building synthetic fraud_cases ({args.rows:,} rows) on {engine.dialect.name}")
+    reset_schema(engine)
+    load_synthetic_rows(engine, args.rows, args.clients)
+
+    before = time_queries(engine, args.clients, args.repeat)
+    start = time.perf_counter()
+    migrate(engine)
+    print(f"Index migration took {time.perf_counter() - start:.1f}s")
+    after = time_queries(engine, args.clients, args.repeat)
+
+    print(f"\n{'query':<45} {'before p50/max (ms)':>22} {'after p50/max (ms)':>22} {'speed-up':>9}")
+    for label in QUERIES:
+        (b50, bmax), (a50, amax) = before[label], after[label]
+        print(f"{label:<45} {b50:>12.2f} / {bmax:>7.2f} {a50:>12.2f} / {amax:>7.2f} {b50 / a50:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""Reproducible benchmark and load-test suite for the fraud detection API.
+
+Usage:
+    python benchmarks/run_suite.py [--out results.json] [--compare baseline.json]
+    MICRO_BATCH_ENABLED=1 python benchmarks/run_suite.py --out micro_batch.json   # any app env var
+
+Everything runs in a scratch directory: synthetic accounts (see ``synthetic.py``), a
+stub LightGBM model saved as ``fraud_model.pkl``, and a SQLite database (``DB_URL``) seeded
+with scored cases spread over the last 30 days. ``app.py`` is imported against that
+environment with ``ollama`` replaced by a fake client that sleeps ``--llm-latency-ms``.
+
+Two phases:
+  * micro-benchmarks of each stage (encoding, predict, insert, rollup aggregation,
+    keyset page query, PDF build), called in-process;
+  * a concurrent load generator that drives ``/predict``, ``/fraud_cases``,
+    ``/generate_summary`` and ``/generate_report`` over HTTP on a local server and reports
+    throughput and p50/p95/p99 latency per endpoint.
+
+Results, with the git commit and run parameters, are written as JSON. ``--compare`` prints
+the change against an earlier results file so regressions show up across commits.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import joblib
+import numpy as np
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from synthetic import account_records, generate_accounts, train_stub_model  # noqa: E402
+
+
+class FakeOllama:
+    """Stands in for the ``ollama`` module: ``chat()`` sleeps, then returns canned text."""
+
+    def __init__(self, latency_ms):
+        self.latency = latency_ms / 1000.0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def chat(self, model, messages):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return {"message": {"content": "**Summary:** activity is consistent with the assigned risk level, "
+                                       "based on the recorded deposits, withdrawals and trading volume."}}
+
+
+def latency_summary(timings_ms):
+    timings = np.asarray(timings_ms)
+    return {
+        "n": int(len(timings)),
+        "mean_ms": round(float(timings.mean()), 4),
+        "p50_ms": round(float(np.percentile(timings, 50)), 4),
+        "p95_ms": round(float(np.percentile(timings, 95)), 4),
+        "p99_ms": round(float(np.percentile(timings, 99)), 4),
+        "max_ms": round(float(timings.max()), 4),
+    }
+
+
+def time_stage(fn, repeat, warmup=3):
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    result = latency_summary(timings)
+    result["ops_per_s"] = round(1000.0 / result["mean_ms"], 1) if result["mean_ms"] else None
+    return result
+
+
+def prepare_environment(args):
+    """Builds the scratch directory, imports app.py against it and seeds the database."""
+    workdir = args.workdir or tempfile.mkdtemp(prefix="fraud_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    db_path = os.path.join(workdir, "bench.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    print(f"⏳ Generating {args.accounts:,} synthetic accounts and a stub model in {workdir}")
+    accounts = generate_accounts(args.accounts, seed=args.seed)
+    joblib.dump(train_stub_model(accounts), os.path.join(workdir, "fraud_model.pkl"))
+
+    os.environ["DB_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("REPORT_SYNC_TIMEOUT_SECONDS", "600")
+    os.chdir(workdir)
+    import app
+
+    fake_ollama = FakeOllama(args.llm_latency_ms)
+    app.ollama = fake_ollama
+    if not app.wait_until_ready(timeout=300):
+        sys.exit("❌ App did not become ready (schema migration / model load)")
+    loaded = app.model_registry.current
+
+    print(f"⏳ Seeding fraud_cases with {args.rows:,} scored rows over the last 30 days")
+    records = account_records(accounts)
+    rng = random.Random(args.seed)
+    now = datetime.strptime(app.malaysia_now(), "%Y-%m-%d %H:%M:%S")
+    labels = loaded.encoder.predict_many(records)
+    rows = []
+    for i in range(args.rows):
+        record = records[i % len(records)]
+        detected = now - timedelta(seconds=rng.randrange(30 * 24 * 3600))
+        rows.append(dict(record, risk_level=labels[i % len(records)], model_version=loaded.version,
+                         detection_timestamp=detected.strftime("%Y-%m-%d %H:%M:%S")))
+    rows.sort(key=lambda row: row["detection_timestamp"])
+    app.write_fraud_cases(rows)
+    return app, fake_ollama, records, now
+
+
+def run_micro_benchmarks(app, records, now, repeat):
+    from rollups import report_stats
+    from report_builder import build_sections, render_report
+    from sqlalchemy import text
+    from feature_store import FeatureStore
+    from summary_cache import summary_cache_key
+
+    encoder = app.model_registry.current.encoder
+    rng = random.Random(1)
+    batch = records[:1000]
+    start_day = (now - timedelta(days=30)).strftime("%Y-%m-%d")
+    end_day = (now + timedelta(days=1)).strftime("%Y-%m-%d")
+    with app.engine.connect() as conn:
+        max_id = conn.execute(text("SELECT MAX(id) FROM fraud_cases")).scalar()
+        stats = report_stats(conn, start_day, end_day)
+    sections = build_sections(stats)
+    narratives = ["Narrative text for this section of the report. " * 4] * len(sections)
+
+    def insert_500():
+        detected = app.malaysia_now()
+        app.write_fraud_cases([dict(record, risk_level="No Risk", model_version=None, detection_timestamp=detected)
+                               for record in records[:500]])
+
+    def aggregate():
+        with app.engine.connect() as conn:
+            report_stats(conn, start_day, end_day)
+
+    def page_query():
+        with app.engine.connect() as conn:
+            conn.execute(text("SELECT * FROM fraud_cases WHERE id > :after_id ORDER BY id LIMIT 100"),
+                         {"after_id": rng.randrange(max_id)}).fetchall()
+
+    # Standalone store, so app.feature_store (if enabled) is not polluted
+    feature_store = FeatureStore()
+    for record in records:
+        feature_store.record(record["client_id"], record["deposit_amount"], record["withdrawal_amount"],
+                             record["num_trades"])
+
+    def feature_store_record():
+        record = rng.choice(records)
+        feature_store.record(record["client_id"], record["deposit_amount"], record["withdrawal_amount"],
+                             record["num_trades"])
+
+    def pdf_build():
+        render_report(io.BytesIO(), "Trading Fraud Report", sections, narratives)
+
+    stages = {
+        "encode_one": (lambda: encoder.encode_one(rng.choice(records)), repeat * 10),
+        "encode_many_1000": (lambda: encoder.encode_many(batch), repeat),
+        "predict_one": (lambda: encoder.predict_one(rng.choice(records)), repeat * 10),
+        "predict_many_1000": (lambda: encoder.predict_many(batch), repeat),
+        "insert_500_rows": (insert_500, max(repeat // 5, 5)),
+        "report_stats_30_days": (aggregate, repeat),
+        "fraud_cases_page_query": (page_query, repeat * 5),
+        "pdf_build": (pdf_build, max(repeat // 5, 5)),
+        "feature_store_record": (feature_store_record, repeat * 10),
+        "summary_cache_key": (lambda: summary_cache_key(rng.choice(records), "template", "llama3"), repeat * 10),
+    }
+    results = {}
+    for name, (fn, n) in stages.items():
+        results[name] = time_stage(fn, n)
+        print(f"  {name:<26} p50 {results[name]['p50_ms']:>9.3f} ms   p95 {results[name]['p95_ms']:>9.3f} ms")
+    return results
+
+
+def start_server(app):
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass  # Per-request access logs would dominate the output
+
+    server = make_server("127.0.0.1", 0, app.app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, name="bench-server", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def http_call(base_url, method, path, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(base_url + path, data=data, method=method,
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=600) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        return e.code
+
+
+def run_load(base_url, make_request, requests, concurrency):
+    """Issues ``requests`` calls from ``concurrency`` threads; returns throughput and percentiles."""
+    timings, statuses = [], {}
+    lock = threading.Lock()
+
+    def worker(i):
+        method, path, body = make_request(i)
+        start = time.perf_counter()
+        try:
+            status = http_call(base_url, method, path, body)
+        except Exception:
+            status = "error"
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            timings.append(elapsed)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(requests)))
+    wall = time.perf_counter() - started
+
+    result = latency_summary(timings)
+    result.update({
+        "concurrency": concurrency,
+        "throughput_rps": round(requests / wall, 2),
+        "errors": sum(count for status, count in statuses.items() if not status.startswith("2")),
+        "status_counts": statuses,
+    })
+    return result
+
+
+def run_load_tests(app, records, now, args):
+    server, base_url = start_server(app)
+    rng = random.Random(2)
+    clients = [record["client_id"] for record in records[:args.summary_clients]]
+    days = [(now - timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(30)]
+
+    def report_range(_):
+        first = rng.randrange(len(days) - 7)
+        return "POST", "/generate_report", {"start_date": days[first + 7], "end_date": days[first]}
+
+    scenarios = {
+        "POST /predict": (lambda _: ("POST", "/predict", rng.choice(records)), args.requests),
+        "GET /fraud_cases (page)": (lambda _: ("GET", f"/fraud_cases?limit=100&after_id={rng.randrange(args.rows)}",
+                                               None), args.requests),
+        "POST /generate_summary": (lambda _: ("POST", "/generate_summary", {"client_id": rng.choice(clients)}),
+                                   args.requests),
+        "POST /generate_report": (report_range, args.report_requests),
+    }
+    results = {}
+    try:
+        for name, (make_request, requests) in scenarios.items():
+            results[name] = run_load(base_url, make_request, requests, args.concurrency)
+            r = results[name]
+            print(f"  {name:<26} {r['throughput_rps']:>8.1f} req/s   p50 {r['p50_ms']:>8.2f}   "
+                  f"p95 {r['p95_ms']:>8.2f}   p99 {r['p99_ms']:>8.2f} ms   errors {r['errors']}")
+    finally:
+        server.shutdown()
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """Prints p50 / p95 / throughput deltas against an earlier results file."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nChange vs {baseline_path} (commit {baseline['meta'].get('commit')}); negative latency is faster")
+    for phase, metrics in (("micro", ["p50_ms", "p95_ms"]), ("load", ["p50_ms", "p99_ms", "throughput_rps"])):
+        for name, current in results[phase].items():
+            previous = baseline.get(phase, {}).get(name)
+            if not previous:
+                continue
+            deltas = []
+            for metric in metrics:
+                if previous.get(metric):
+                    deltas.append(f"{metric} {(current[metric] - previous[metric]) / previous[metric] * 100:+6.1f}%")
+            print(f"  {name:<26} " + "   ".join(deltas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default="benchmark_results.json")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    parser.add_argument("--workdir", help="Scratch directory (default: a new temp dir)")
+    parser.add_argument("--accounts", type=int, default=20000, help="Synthetic accounts (also the stub model's training set)")
+    parser.add_argument("--rows", type=int, default=50000, help="fraud_cases rows seeded before the run")
+    parser.add_argument("--repeat", type=int, default=50, help="Base repetitions per micro-benchmark")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint in the load test")
+    parser.add_argument("--report-requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--summary-clients", type=int, default=200, help="Distinct clients asked for summaries")
+    parser.add_argument("--llm-latency-ms", type=float, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-load", action="store_true")
+    args = parser.parse_args()
+    out_path = os.path.abspath(args.out)
+    compare_path = os.path.abspath(args.compare) if args.compare else None
+
+    app, fake_ollama, records, now = prepare_environment(args)
+
+    print("⏱️ Micro-benchmarks")
+    micro = run_micro_benchmarks(app, records, now, args.repeat)
+    load = {}
+    if not args.skip_load:
+        print(f"🚀 Load test ({args.concurrency} concurrent clients)")
+        load = run_load_tests(app, records, now, args)
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "params": {key: value for key, value in vars(args).items() if key not in ("out", "compare", "workdir")},
+            "app_env": {key: value for key, value in os.environ.items()
+                        if key.startswith(("MICRO_BATCH", "WRITE_BEHIND", "INFERENCE", "SUMMARY_CACHE", "REPORT_"))},
+            "llm_calls": fake_ollama.calls,
+        },
+        "micro": micro,
+        "load": load,
+    }
+    with open(out_path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"✅ Results written to {out_path}")
+    if compare_path:
+        compare(results, compare_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Multi-process serving: /predict throughput and memory of serve.py by worker count.
+
+Usage:
+    python benchmarks/serve_benchmark.py [--workers 1,2,4,8] [--seconds 15] [--concurrency 64]
+
+Builds synthetic accounts and a stub model in a scratch directory (like ``run_suite.py``).
+For each worker count, it then starts ``serve.py`` on a SQLite database with write-behind
+persistence and waits for ``/ready``. It drives ``POST /predict`` for ``--seconds`` from
+``--concurrency`` connections spread over ``--client-processes`` load-generator
+processes, and reports requests/s, p50/p99 latency and scaling efficiency relative to one
+worker. On Linux it also reports the proportional set size (PSS) of the master and the
+workers, which shows how much of the preloaded model and libraries they share.
+
+The load generator competes with the workers for CPU on the same machine. Keep the worker
+counts below the core count (or run the generator elsewhere against ``--url``) for
+numbers that reflect the server alone.
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+import joblib
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from run_suite import latency_summary  # noqa: E402
+from synthetic import account_records, generate_accounts, train_stub_model  # noqa: E402
+
+
+def wait_ready(base_url, timeout=300):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(base_url + "/ready", timeout=5) as response:
+                if response.status == 200:
+                    return True
+        except OSError:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def drive(args):
+    """Load-generator process: ``threads`` connections posting /predict until ``deadline``."""
+    base_url, records, threads, deadline, seed = args
+    url = urllib.parse.urlsplit(base_url)
+    timings, errors = [], 0
+    lock = threading.Lock()
+
+    def worker(i):
+        nonlocal errors
+        rng = random.Random(seed * 1000 + i)
+        local, failed = [], 0
+        while time.monotonic() < deadline:
+            body = json.dumps(rng.choice(records))
+            start = time.perf_counter()
+            try:
+                conn = http.client.HTTPConnection(url.hostname, url.port, timeout=60)
+                conn.request("POST", "/predict", body, {"Content-Type": "application/json"})
+                response = conn.getresponse()
+                response.read()
+                conn.close()
+                ok = response.status == 200
+            except OSError:
+                ok = False
+            if ok:
+                local.append((time.perf_counter() - start) * 1000)
+            else:
+                failed += 1
+        with lock:
+            timings.extend(local)
+            errors += failed
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return timings, errors
+
+
+def run_load(base_url, records, seconds, concurrency, processes):
+    per_process = [concurrency // processes + (1 if i < concurrency % processes else 0) for i in range(processes)]
+    deadline = time.monotonic() + seconds
+    with multiprocessing.Pool(processes) as pool:
+        started = time.perf_counter()
+        results = pool.map(drive, [(base_url, records, threads, deadline, i)
+                                   for i, threads in enumerate(per_process) if threads])
+        wall = time.perf_counter() - started
+    timings = [t for process_timings, _ in results for t in process_timings]
+    result = latency_summary(timings) if timings else {"n": 0}
+    result.update({"throughput_rps": round(len(timings) / wall, 1), "errors": sum(e for _, e in results)})
+    return result
+
+
+def memory_kb(pid):
+    """(pss, private) in kB from /proc/<pid>/smaps_rollup, or None where unavailable."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+    except OSError:
+        return None
+
+    def kb(name):
+        return int(fields.get(name, "0 kB").split()[0])
+
+    return kb("Pss"), kb("Private_Clean") + kb("Private_Dirty")
+
+
+def server_memory(master_pid):
+    try:
+        children = subprocess.run(["pgrep", "-P", str(master_pid)], capture_output=True, text=True).stdout.split()
+    except OSError:
+        return None
+    master, workers = memory_kb(master_pid), [memory_kb(int(pid)) for pid in children]
+    if master is None or None in workers:
+        return None
+    return {"total_pss_mb": round((master[0] + sum(w[0] for w in workers)) / 1024, 1),
+            "worker_private_mb": round(sum(w[1] for w in workers) / len(workers) / 1024, 1) if workers else 0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts to measure")
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--client-processes", type=int, default=max(1, (os.cpu_count() or 2) // 4))
+    parser.add_argument("--accounts", type=int, default=20000)
+    parser.add_argument("--port", type=int, default=5077)
+    parser.add_argument("--url", help="Benchmark an already running server instead (no memory figures)")
+    parser.add_argument("--workdir", help="Scratch directory (default: a new temp dir)")
+    args = parser.parse_args()
+
+    accounts = generate_accounts(args.accounts)
+    records = account_records(accounts)[:2000]
+    if args.url:
+        if not wait_ready(args.url):
+            sys.exit(f"❌ {args.url} is not ready")
+        result = run_load(args.url, records, args.seconds, args.concurrency, args.client_processes)
+        print(json.dumps(result, indent=2))
+        return
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="fraud_serve_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    model_path = os.path.join(workdir, "fraud_model.pkl")
+    joblib.dump(train_stub_model(accounts), model_path)
+    print(f"⏳ Scratch directory {workdir}; {os.cpu_count()} CPUs")
+
+    rows = []
+    for workers in [int(n) for n in args.workers.split(",")]:
+        db_path = os.path.join(workdir, f"serve_{workers}.db")
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        env = dict(os.environ, DB_URL=f"sqlite:///{db_path}", MODEL_PATH=model_path, WRITE_BEHIND_ENABLED="1",
+                   REPORT_OUTPUT_DIR=os.path.join(workdir, "reports"))
+        base_url = f"http://127.0.0.1:{args.port}"
+        with open(os.path.join(workdir, f"serve_{workers}.log"), "w") as log:
+            server = subprocess.Popen([sys.executable, os.path.join(REPO_DIR, "serve.py"), "--workers", str(workers),
+                                       "--port", str(args.port)], cwd=workdir, env=env, stdout=log,
+                                      stderr=subprocess.STDOUT)
+            try:
+                if not wait_ready(base_url):
+                    sys.exit(f"❌ serve.py with {workers} workers did not become ready (see {log.name})")
+                time.sleep(2)  # Every worker accepting, not just the first
+                run_load(base_url, records, 2, args.concurrency, args.client_processes)  # Warm-up
+                result = run_load(base_url, records, args.seconds, args.concurrency, args.client_processes)
+                result["workers"] = workers
+                result["memory"] = server_memory(server.pid)
+            finally:
+                server.send_signal(signal.SIGTERM)
+                server.wait(timeout=120)
+        rows.append(result)
+        print(f"  {workers} workers: {result['throughput_rps']:,.1f} req/s, p50 {result.get('p50_ms', 0):.1f} ms, "
+              f"p99 {result.get('p99_ms', 0):.1f} ms, {result['errors']} errors")
+
+    base = rows[0]["throughput_rps"] / rows[0]["workers"] if rows and rows[0]["throughput_rps"] else None
+    print(f"\n{'workers':>8} {'req/s':>10} {'speed-up':>9} {'efficiency':>11} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'PSS MB':>8} {'private/worker MB':>18}")
+    for row in rows:
+        speedup = row["throughput_rps"] / rows[0]["throughput_rps"] if rows[0]["throughput_rps"] else 0
+        efficiency = row["throughput_rps"] / (base * row["workers"]) if base else 0
+        memory = row["memory"] or {}
+        print(f"{row['workers']:>8} {row['throughput_rps']:>10,.1f} {speedup:>8.2f}x {efficiency:>10.0%} "
+              f"{row.get('p50_ms', 0):>8.1f} {row.get('p99_ms', 0):>8.1f} "
+              f"{memory.get('total_pss_mb', float('nan')):>8.1f} {memory.get('worker_private_mb', float('nan')):>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
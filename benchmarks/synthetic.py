@@ -0,0 +1,74 @@
+"""Synthetic accounts and a stub fraud model for benchmarks.
+
+``generate_accounts()`` follows "Synthetic Data Creation .ipynb": the same feature
+ranges, the percentile-weighted risk score with a 70/15/10/5 split, and high-risk
+accounts placed in high-risk countries 98% of the time. ``train_stub_model()`` fits
+a small LGBMClassifier with the notebook's parameters on pandas categoricals, so it
+has the same interface as ``fraud_model.pkl`` and can stand in for it.
+"""
+import numpy as np
+import pandas as pd
+
+HIGH_RISK_COUNTRIES = ["Nigeria", "Pakistan", "Bangladesh", "India", "Vietnam"]
+OTHER_COUNTRIES = ["USA", "Canada", "UK", "Germany", "France", "Australia", "Japan", "Spain", "Italy", "Netherlands",
+                   "Brazil", "South Korea", "Russia", "Mexico", "South Africa", "Malaysia", "Thailand", "Philippines"]
+COUNTRIES = OTHER_COUNTRIES + HIGH_RISK_COUNTRIES
+RISK_LEVELS = ["No Risk", "Low Risk", "Medium Risk", "High Risk"]
+RISK_WEIGHTS = [0.70, 0.15, 0.10, 0.05]
+PAYMENT_METHODS = ["Credit Card", "Crypto", "Bank Transfer", "E-Wallet"]
+ACCOUNT_TYPES = ["Standard", "VIP", "Premium"]
+CATEGORICAL_FEATURES = ["country", "account_type", "payment_method"]
+FEATURE_COLUMNS = ["country", "account_type", "deposit_amount", "withdrawal_amount", "num_trades",
+                   "avg_trade_amount", "trade_duration", "total_profit", "fees_paid", "payment_method"]
+
+
+def generate_accounts(n, seed=42):
+    """Returns a DataFrame of ``n`` accounts with features, client_id and risk_level."""
+    rng = np.random.default_rng(seed)
+    deposits = rng.integers(100, 50000, n)
+    df = pd.DataFrame({
+        "client_id": [f"C{i:06d}" for i in range(1, n + 1)],
+        "account_type": rng.choice(ACCOUNT_TYPES, n),
+        "deposit_amount": deposits,
+        "withdrawal_amount": rng.integers(0, deposits),
+        "num_trades": rng.integers(0, 50, n),
+        "avg_trade_amount": rng.integers(1, 1000, n),
+        "trade_duration": rng.integers(1, 600, n),
+        "total_profit": rng.integers(-5000, 10000, n),
+        "fees_paid": np.round(deposits * rng.uniform(0.001, 0.02, n), 2),
+        "payment_method": rng.choice(PAYMENT_METHODS, n),
+    })
+
+    def pct(column):
+        return df[column].rank(pct=True) * 100
+
+    risk_score = (pct("withdrawal_amount") * 0.3 + (100 - pct("num_trades")) * 0.2
+                  + (100 - pct("trade_duration")) * 0.2 + pct("deposit_amount") * 0.2
+                  + (100 - pct("total_profit")) * 0.1)
+    low, medium, high = np.percentile(risk_score, [70, 85, 95])
+    df["risk_level"] = np.select([risk_score >= high, risk_score >= medium, risk_score >= low],
+                                 ["High Risk", "Medium Risk", "Low Risk"], "No Risk")
+
+    high_risk = (df["risk_level"] == "High Risk").to_numpy()
+    in_high_risk_country = high_risk & (rng.random(n) < 0.98)
+    df["country"] = np.where(in_high_risk_country, rng.choice(HIGH_RISK_COUNTRIES, n),
+                             rng.choice(OTHER_COUNTRIES, n))
+    return df
+
+
+def train_stub_model(accounts, n_estimators=60):
+    """Fits a small multiclass LGBMClassifier on ``accounts`` (notebook parameters)."""
+    import lightgbm as lgb
+
+    X = accounts[FEATURE_COLUMNS].copy()
+    for column in CATEGORICAL_FEATURES:
+        X[column] = X[column].astype("category")
+    model = lgb.LGBMClassifier(objective="multiclass", num_class=4, learning_rate=0.1, max_depth=10,
+                               num_leaves=31, n_estimators=n_estimators, verbose=-1)
+    model.fit(X, accounts["risk_level"])
+    return model
+
+
+def account_records(accounts):
+    """Converts accounts to the JSON records ``/predict`` accepts (no risk_level)."""
+    return accounts.drop(columns=["risk_level"]).to_dict("records")
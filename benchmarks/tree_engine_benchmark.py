@@ -0,0 +1,73 @@
+"""Benchmark: NumPy tree engine vs. the LightGBM model.
+
+Usage:
+    python benchmarks/tree_engine_benchmark.py [--model fraud_model.pkl]
+
+Times ``model.predict`` on a DataFrame (what ``/predict`` used to do), ``Booster.predict``
+on a NumPy matrix and the compiled engine at batch sizes 1, 100 and 50,000. Parity with
+the booster is checked by ``tests/test_tree_engine.py`` (``python -m pytest tests``).
+"""
+import argparse
+import os
+import sys
+import time
+
+import joblib
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from feature_encoder import FeatureEncoder  # noqa: E402
+from tree_engine import CompiledEnsemble, sample_feature_matrix  # noqa: E402
+
+CATEGORICAL_FEATURES = ["country", "account_type", "payment_method"]
+BATCH_SIZES = [1, 100, 50000]
+
+
+def matrix_to_frame(encoder, X):
+    """Rebuilds the categorical DataFrame ``model.predict`` expects from an encoded matrix."""
+    df = pd.DataFrame(X, columns=encoder.feature_names)
+    for name, codes in encoder.category_codes.items():
+        categories = sorted(codes, key=codes.get)
+        column = df[name].fillna(-1).astype(int)
+        column = column.where(column < len(categories), -1)  # Unseen codes -> missing
+        df[name] = pd.Categorical.from_codes(column, categories=categories)
+    return df
+
+
+def time_call(fn, repeat):
+    fn()  # Warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def run_benchmark(model, engine, encoder):
+    print(f"  {'batch':>7} {'model.predict (ms)':>20} {'booster (ms)':>14} {'numpy engine (ms)':>19}")
+    for n in BATCH_SIZES:
+        X = sample_feature_matrix(model, n, seed=42)
+        df = matrix_to_frame(encoder, X)
+        repeat = max(1, min(200, 20000 // n))
+        sklearn_time = time_call(lambda: model.predict(df), repeat)
+        booster_time = time_call(lambda: model.booster_.predict(X, num_threads=1 if n < 256 else 0), repeat)
+        engine_time = time_call(lambda: engine.predict_proba(X), repeat)
+        print(f"  {n:>7} {sklearn_time * 1e3:>20.3f} {booster_time * 1e3:>14.3f} {engine_time * 1e3:>19.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="fraud_model.pkl")
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    engine = CompiledEnsemble.from_model(model)
+    encoder = FeatureEncoder(model, CATEGORICAL_FEATURES)
+    print(f"Compiled {engine.num_trees} trees ({len(engine.split_feature)} nodes, max depth {engine.max_depth})")
+
+    print("Benchmark:")
+    run_benchmark(model, engine, encoder)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import threading
+
+import numpy as np
+
+
+class FeatureEncoder:
+    """Precompiled, DataFrame-free feature encoding for the LightGBM fraud model.
+
+    Built once from the trained ``LGBMClassifier``. Categorical values are mapped to the
+    category codes used at training time (``booster.pandas_categorical``) with a dict
+    lookup, and features are laid out in the model's training column order in a NumPy
+    row or matrix that is passed straight to the booster. Unseen categories become NaN,
+    exactly as LightGBM does for pandas input.
+
+    ``engine`` optionally replaces the booster for scoring; it must provide
+    ``predict_proba(matrix)`` with ``Booster.predict`` semantics (see ``tree_engine``).
+    """
+
+    def __init__(self, model, categorical_features, engine=None):
+        self.model = model
+        self.engine = engine
+        self.booster = model.booster_
+        self.classes = np.asarray(model.classes_)
+        self.feature_names = list(self.booster.feature_name())
+        self.num_features = len(self.feature_names)
+
+        categorical_columns = [name for name in self.feature_names if name in categorical_features]
+        training_categories = self.booster.pandas_categorical or []
+        if len(training_categories) != len(categorical_columns):
+            raise ValueError(
+                f"Model has {len(training_categories)} categorical columns, expected {len(categorical_columns)}"
+            )
+
+        # ✅ value -> training-time code, per categorical column
+        self.category_codes = {
+            name: {str(value): float(code) for code, value in enumerate(categories)}
+            for name, categories in zip(categorical_columns, training_categories)
+        }
+        self._layout = [(i, name, self.category_codes.get(name)) for i, name in enumerate(self.feature_names)]
+        self._local = threading.local()
+
+    def _row_buffer(self):
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = self._local.row = np.empty((1, self.num_features), dtype=np.float64)
+        return row
+
+    def encode_into(self, record, out):
+        """Writes one record's features into the 1-D array ``out``."""
+        for i, name, codes in self._layout:
+            value = record[name]
+            if codes is not None:
+                out[i] = codes.get(str(value), np.nan)
+            else:
+                out[i] = np.nan if value is None else float(value)
+        return out
+
+    def encode_one(self, record):
+        """Encodes one record into a preallocated (per-thread) 1 x n_features row."""
+        row = self._row_buffer()
+        self.encode_into(record, row[0])
+        return row
+
+    def encode_many(self, records):
+        """Encodes many records into a freshly allocated n_records x n_features matrix."""
+        matrix = np.empty((len(records), self.num_features), dtype=np.float64)
+        for record, out in zip(records, matrix):
+            self.encode_into(record, out)
+        return matrix
+
+    def encode_columns(self, columns, num_rows):
+        """Encodes column-oriented data (feature name -> sequence of values, e.g. a DataFrame
+        chunk) into an num_rows x n_features matrix, with the same rules as ``encode_into``."""
+        matrix = np.empty((num_rows, self.num_features), dtype=np.float64)
+        for i, name, codes in self._layout:
+            values = columns[name]
+            if codes is not None:
+                matrix[:, i] = [codes.get(str(value), np.nan) for value in values]
+            else:
+                matrix[:, i] = [np.nan if value is None else value for value in values]
+        return matrix
+
+    def predict_proba(self, matrix):
+        """Returns class probabilities for an encoded matrix by calling the booster directly."""
+        if self.engine is not None:
+            return self.engine.predict_proba(matrix)
+        # Single rows are faster without spinning up OpenMP threads
+        num_threads = 1 if len(matrix) < 256 else 0
+        return self.booster.predict(matrix, num_threads=num_threads)
+
+    def labels_from_proba(self, proba):
+        """Maps booster output to class labels the same way ``LGBMClassifier.predict`` does."""
+        if proba.ndim == 1:
+            return self.classes[(proba > 0.5).astype(int)]
+        return self.classes[np.argmax(proba, axis=1)]
+
+    def predict_one(self, record):
+        """Scores one record and returns its label."""
+        return str(self.labels_from_proba(self.predict_proba(self.encode_one(record)))[0])
+
+    def predict_many(self, records):
+        """Scores many records with one booster call and returns their labels."""
+        if not records:
+            return []
+        return [str(label) for label in self.labels_from_proba(self.predict_proba(self.encode_many(records)))]
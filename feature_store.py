@@ -0,0 +1,262 @@
+"""In-process rolling per-client features (velocity signals) for /predict.
+
+For every client_id the store keeps one ring of fixed-width time buckets per window
+(1h, 24h, 7d). Each bucket holds the transaction count and the deposit, withdrawal and
+trade sums, and each window keeps running totals over its ring. Recording a transaction
+first advances each ring to the current bucket: buckets that fall out of the window are
+subtracted from the totals and zeroed. It then adds the values to the newest bucket.
+Updates and reads are O(1) amortized and take a few microseconds. Windows slide at
+bucket granularity (5 minutes, 1 hour and 6 hours).
+
+All of a client's buckets live in one flat ``array('d')``. Clients are kept in
+least-recently-seen order. A client is evicted once it has been idle for longer than
+``idle_seconds`` (by default the longest window), or when the store holds more than
+``max_clients`` clients.
+
+``rebuild()`` replays the last 7 days of ``fraud_cases`` at startup into a fresh set of
+clients without holding the lock, then swaps it in. It snapshots MAX(id) under the lock
+while no commit is in progress (commits run inside ``writing()``), together with every
+transaction whose row was not written yet. Those, plus the transactions recorded during
+the rebuild, are added to the new state: their rows get ids above the snapshot, so each
+transaction is counted exactly once.
+"""
+import threading
+import time
+from array import array
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytz
+from sqlalchemy import text
+
+# (name, span in seconds, number of buckets)
+WINDOWS = (("1h", 3600, 12), ("24h", 24 * 3600, 24), ("7d", 7 * 24 * 3600, 28))
+METRICS = ("txn_count", "deposit_sum", "withdrawal_sum", "trades_sum")
+FEATURE_NAMES = [f"{metric}_{window}" for window, _, _ in WINDOWS for metric in METRICS]
+
+_M = len(METRICS)
+_LAYOUT = []  # Per window: (bucket width, number of buckets, ring offset, totals offset)
+_offset = 0
+for _i, (_, _span, _buckets) in enumerate(WINDOWS):
+    _LAYOUT.append((_span / _buckets, _buckets, _offset, _i * _M))
+    _offset += _buckets * _M
+_RING_SIZE = _offset
+_TOTALS_SIZE = len(WINDOWS) * _M
+_ZEROS = bytes(8 * _RING_SIZE)
+
+MALAYSIA_TZ = pytz.timezone("Asia/Kuala_Lumpur")
+
+
+def _epoch(detection_timestamp):
+    """fraud_cases timestamps are naive Malaysia Time (a datetime, or a string on SQLite)."""
+    if isinstance(detection_timestamp, str):
+        detection_timestamp = datetime.strptime(detection_timestamp[:19], "%Y-%m-%d %H:%M:%S")
+    if detection_timestamp.tzinfo is None:
+        detection_timestamp = MALAYSIA_TZ.localize(detection_timestamp)
+    return detection_timestamp.timestamp()
+
+
+class _ClientWindows:
+    __slots__ = ("ring", "totals", "heads", "last_seen")
+
+    def __init__(self):
+        self.ring = array("d", _ZEROS)
+        self.totals = array("d", _ZEROS[:8 * _TOTALS_SIZE])
+        self.heads = [None] * len(WINDOWS)  # Absolute index of each window's newest bucket
+        self.last_seen = 0.0
+
+    def _advance(self, w, bucket):
+        """Moves window ``w`` forward to ``bucket``, expiring the buckets that fall out."""
+        head = self.heads[w]
+        if head is not None and bucket <= head:
+            return
+        self.heads[w] = bucket
+        if head is None:
+            return
+        _, n, ring_offset, total_offset = _LAYOUT[w]
+        ring, totals = self.ring, self.totals
+        if bucket - head >= n:
+            # The whole window expired: reset exactly instead of subtracting
+            ring[ring_offset:ring_offset + n * _M] = array("d", _ZEROS[:8 * n * _M])
+            for m in range(_M):
+                totals[total_offset + m] = 0.0
+            return
+        for b in range(head + 1, bucket + 1):
+            base = ring_offset + (b % n) * _M
+            for m in range(_M):
+                totals[total_offset + m] -= ring[base + m]
+                ring[base + m] = 0.0
+
+    def add(self, ts, values):
+        count, deposit, withdrawal, trades = values
+        ring, totals, heads = self.ring, self.totals, self.heads
+        for w, (width, n, ring_offset, t) in enumerate(_LAYOUT):
+            bucket = int(ts // width)
+            head = heads[w]
+            if head is None or bucket > head:
+                self._advance(w, bucket)
+            elif bucket <= head - n:
+                continue  # Late event that is already outside this window
+            b = ring_offset + (bucket % n) * _M
+            ring[b] += count
+            ring[b + 1] += deposit
+            ring[b + 2] += withdrawal
+            ring[b + 3] += trades
+            totals[t] += count
+            totals[t + 1] += deposit
+            totals[t + 2] += withdrawal
+            totals[t + 3] += trades
+        if ts > self.last_seen:
+            self.last_seen = ts
+
+    def read(self, ts):
+        for w, (width, _, _, _) in enumerate(_LAYOUT):
+            self._advance(w, int(ts // width))
+        return self.totals.tolist()
+
+
+class FeatureStore:
+    def __init__(self, max_clients=1000000, idle_seconds=WINDOWS[-1][1]):
+        self.max_clients = max_clients
+        self.idle_seconds = idle_seconds
+        self._clients = OrderedDict()  # client_id -> _ClientWindows, least recently seen first
+        self._unwritten = {}  # (client_id, values) -> timestamps of transactions whose rows are not committed yet
+        self._pending = None  # Counter of transactions to add to a running rebuild's result
+        self._lock = threading.Lock()
+        self._gate = threading.Condition(self._lock)  # Orders commits against the rebuild snapshot
+        self._writes = 0  # Commits in progress
+        self._snapshotting = False
+        self._stats = {"updates": 0, "evictions": 0, "rebuilt_rows": 0}
+
+    def _evict(self, clients, now):
+        while clients:
+            client_id, state = next(iter(clients.items()))
+            if len(clients) <= self.max_clients and state.last_seen >= now - self.idle_seconds:
+                break
+            clients.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _add(self, clients, client_id, ts, values):
+        state = clients.get(client_id)
+        if state is None:
+            state = clients[client_id] = _ClientWindows()
+        else:
+            clients.move_to_end(client_id)
+        state.add(ts, values)
+        self._evict(clients, ts)
+        return state
+
+    def record(self, client_id, deposit_amount, withdrawal_amount, num_trades, ts=None):
+        """Adds one transaction and returns the client's features including it. Its row is
+        expected to be committed inside ``writing()``, or the transaction ``discard()``-ed."""
+        ts = time.time() if ts is None else ts
+        values = (1.0, deposit_amount, withdrawal_amount, num_trades)
+        with self._lock:
+            self._stats["updates"] += 1
+            self._unwritten.setdefault((client_id, values), []).append(ts)
+            if self._pending is not None:
+                self._pending[(client_id, ts, values)] += 1
+            # add() has already advanced every window to ``ts``
+            totals = self._add(self._clients, client_id, ts, values).totals.tolist()
+        return dict(zip(FEATURE_NAMES, totals))
+
+    def discard(self, client_id, deposit_amount, withdrawal_amount, num_trades, ts=None):
+        """Takes back a transaction recorded at ``ts`` (the oldest one with these values when
+        omitted) whose row was not written. Transactions already written are kept."""
+        values = (1.0, deposit_amount, withdrawal_amount, num_trades)
+        with self._lock:
+            timestamps = self._unwritten.get((client_id, values))
+            if not timestamps or (ts is not None and ts not in timestamps):
+                return
+            ts = timestamps.pop(0) if ts is None else timestamps.pop(timestamps.index(ts))
+            if not timestamps:
+                del self._unwritten[(client_id, values)]
+            if self._pending is not None and self._pending[(client_id, ts, values)] > 0:
+                self._pending[(client_id, ts, values)] -= 1
+            state = self._clients.get(client_id)
+            if state is not None:
+                state.add(ts, tuple(-value for value in values))
+
+    @contextmanager
+    def writing(self, rows):
+        """Wraps the commit of fraud_cases ``rows``; once it succeeds their transactions count
+        as written. A rebuild never snapshots MAX(id) while a commit is in progress."""
+        keys = [(row["client_id"], (1.0, float(row["deposit_amount"]), float(row["withdrawal_amount"]),
+                                    float(row["num_trades"]))) for row in rows]
+        with self._gate:
+            self._gate.wait_for(lambda: not self._snapshotting)
+            self._writes += 1
+        written = False
+        try:
+            yield
+            written = True
+        finally:
+            with self._gate:
+                self._writes -= 1
+                if written:
+                    for key in keys:
+                        timestamps = self._unwritten.get(key)
+                        if timestamps:
+                            timestamps.pop(0)
+                            if not timestamps:
+                                del self._unwritten[key]
+                self._gate.notify_all()
+
+    def features(self, client_id, ts=None):
+        """Returns the client's current features without recording anything (zeros if unknown)."""
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            state = self._clients.get(client_id)
+            totals = state.read(ts) if state is not None else [0.0] * _TOTALS_SIZE
+        return dict(zip(FEATURE_NAMES, totals))
+
+    def rebuild(self, conn, now=None, fetch_size=5000):
+        """Replaces the state with the last 7 days of fraud_cases. Returns the rows replayed.
+
+        MAX(id) is read under the lock once in-progress commits finish, and the transactions
+        not written by then start the pending set in the same step. Rows up to that id are
+        replayed outside the lock, so ``record()`` keeps working meanwhile; the pending
+        transactions (whose rows get higher ids) are added before the swap."""
+        now = time.time() if now is None else now
+        since = datetime.fromtimestamp(now - WINDOWS[-1][1], MALAYSIA_TZ).strftime("%Y-%m-%d %H:%M:%S")
+        with self._gate:
+            self._snapshotting = True
+            try:
+                self._gate.wait_for(lambda: self._writes == 0)
+                max_id = conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM fraud_cases")).scalar()
+                self._pending = Counter()
+                for (client_id, values), timestamps in self._unwritten.items():
+                    for ts in timestamps:
+                        self._pending[(client_id, ts, values)] += 1
+            finally:
+                self._snapshotting = False
+                self._gate.notify_all()
+        try:
+            result = conn.execution_options(stream_results=True, yield_per=fetch_size).execute(text("""
+                SELECT client_id, deposit_amount, withdrawal_amount, num_trades, detection_timestamp
+                FROM fraud_cases WHERE detection_timestamp >= :since AND id <= :max_id
+                ORDER BY detection_timestamp
+            """), {"since": since, "max_id": max_id})
+            clients = OrderedDict()
+            rows = 0
+            for row in result:
+                self._add(clients, row.client_id, _epoch(row.detection_timestamp),
+                          (1.0, float(row.deposit_amount), float(row.withdrawal_amount), float(row.num_trades)))
+                rows += 1
+            with self._lock:
+                for (client_id, ts, values), count in self._pending.items():
+                    for _ in range(count):
+                        self._add(clients, client_id, ts, values)
+                self._evict(clients, max(now, time.time()))
+                self._clients = clients
+                self._stats["rebuilt_rows"] = rows
+        finally:
+            with self._lock:
+                self._pending = None
+        return rows
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "clients": len(self._clients), "max_clients": self.max_clients,
+                    "windows": [name for name, _, _ in WINDOWS]}
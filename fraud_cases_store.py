@@ -0,0 +1,62 @@
+"""Shared fraud_cases write path, used by app.py and the offline batch scorer."""
+import math
+from datetime import datetime
+
+import pytz
+from sqlalchemy import text
+
+from rollups import update_rollups
+
+fraud_case_columns = ["client_id", "detection_timestamp", "country", "account_type", "deposit_amount",
+                      "withdrawal_amount", "num_trades", "avg_trade_amount", "trade_duration",
+                      "total_profit", "fees_paid", "payment_method", "risk_level", "model_version"]
+fraud_case_integer_columns = ["deposit_amount", "withdrawal_amount", "num_trades", "avg_trade_amount",
+                              "trade_duration", "total_profit"]  # INT columns; fees_paid is FLOAT
+INSERT_CHUNK_SIZE = 500  # Rows per multi-row INSERT statement
+DB_TIME_ZONE = "+08:00"  # Malaysia Time, for every session that touches detection timestamps
+
+
+def malaysia_now():
+    """Returns the current Malaysia Time (UTC+8) formatted for the detection timestamp."""
+    malaysia_tz = pytz.timezone("Asia/Kuala_Lumpur")
+    return datetime.now(malaysia_tz).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def set_session_timezone(conn):
+    """Puts a MySQL session in Malaysia Time. Inserts, rollups, the archive and API reads all
+    call it, so TIMESTAMP values round-trip unshifted (SQLite stores the literal timestamp)."""
+    if conn.dialect.name == "mysql":
+        conn.execute(text(f"SET time_zone = '{DB_TIME_ZONE}';"))
+
+
+def _round_half_away(value):
+    """Rounds like MySQL does for exact values: 2.5 -> 3, -2.5 -> -3."""
+    return int(math.copysign(math.floor(abs(value) + 0.5), value))
+
+
+def normalize_row(row):
+    """Returns the row with INT columns rounded to the integers that are stored and fees_paid
+    as a float, so fraud_cases and the rollups aggregate exactly the same values."""
+    normalized = dict(row)
+    for col in fraud_case_integer_columns:
+        normalized[col] = _round_half_away(float(row[col]))
+    normalized["fees_paid"] = float(row["fees_paid"])
+    return normalized
+
+
+def insert_fraud_cases(conn, rows):
+    """Writes scored rows to fraud_cases using one multi-row INSERT per chunk (caller commits)."""
+    set_session_timezone(conn)
+    rows = [normalize_row(row) for row in rows]  # Once, for both the INSERT and the rollups
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        chunk = rows[start:start + INSERT_CHUNK_SIZE]
+        values_sql = []
+        params = {}
+        for i, row in enumerate(chunk):
+            values_sql.append("(" + ", ".join(f":{col}_{i}" for col in fraud_case_columns) + ")")
+            for col in fraud_case_columns:
+                params[f"{col}_{i}"] = row[col]
+        conn.execute(text(
+            f"INSERT INTO fraud_cases ({', '.join(fraud_case_columns)}) VALUES {', '.join(values_sql)}"
+        ), params)
+        update_rollups(conn, chunk)  # Same transaction, so rollups never drift from the raw rows
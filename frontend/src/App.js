@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import io from "socket.io-client";
 import axios from "axios";
 import { Table, Tag, Button, Card, Layout, Typography, Row, Col, DatePicker, Space } from "antd";
@@ -8,7 +8,10 @@ import { notification } from "antd";
 const { Header, Content } = Layout;
 const { Title } = Typography;
 const { RangePicker } = DatePicker;
-const socket = io("http://127.0.0.1:5000");
+const API_URL = "http://127.0.0.1:5000";
+const PAGE_LIMIT = 1000;
+const REPORT_POLL_INTERVAL_MS = 2000;
+const socket = io(API_URL, { transports: ["websocket"] });
 
 function App() {
   const [transactions, setTransactions] = useState([]);
@@ -18,70 +21,120 @@ function App() {
   const [dateRange, setDateRange] = useState([]);
   const [pageSize, setPageSize] = useState(5);
 
+  // ✅ Incrementally maintained view: the last seen id plus running counts per risk level / country
+  const lastIdRef = useRef(0);
+  const initialLoadDoneRef = useRef(false);
+  const riskCountsRef = useRef({});
+  const highRiskCountryCountsRef = useRef({});
+
   useEffect(() => {
     fetchTransactions();
 
+    // ✅ New rows arrive in coalesced batches; only O(new rows) work per update
+    socket.on("fraud_cases_delta", (delta) => {
+      if (initialLoadDoneRef.current) {
+        applyNewRows(delta.items);
+      }
+    });
+
+    // ✅ Subscribe (again) on every (re)connect and catch up on anything missed while offline
+    socket.on("connect", () => {
+      socket.emit("subscribe", {});
+      if (initialLoadDoneRef.current) {
+        fetchChanges();
+      }
+    });
+
     socket.on("fraud_alert", (alert) => {
-      setTransactions((prevTransactions) => {
-        const updatedTransactions = [alert.data, ...prevTransactions];
-        processFraudData(updatedTransactions);
-        processHighRiskCountryData(updatedTransactions);
-        return updatedTransactions;
+      notification.warning({
+        message: alert.message,
+        description: `Client ${alert.data.client_id} was flagged as High Risk.`,
       });
     });
 
     return () => {
+      socket.off("fraud_cases_delta");
+      socket.off("connect");
       socket.off("fraud_alert");
     };
   }, []);
 
-  const fetchTransactions = () => {
-    axios
-      .get("http://127.0.0.1:5000/fraud_cases")
-      .then((response) => {
-        setTransactions(response.data);
-        processFraudData(response.data);
-        processHighRiskCountryData(response.data);
-      })
-      .catch((error) => console.error("Error fetching transactions", error));
+  const applyNewRows = (rows) => {
+    const newRows = rows.filter((row) => row.id > lastIdRef.current);
+    if (!newRows.length) {
+      return;
+    }
+    lastIdRef.current = newRows[newRows.length - 1].id;
+
+    newRows.forEach((row) => {
+      riskCountsRef.current[row.risk_level] = (riskCountsRef.current[row.risk_level] || 0) + 1;
+      if (row.risk_level === "High Risk") {
+        highRiskCountryCountsRef.current[row.country] = (highRiskCountryCountsRef.current[row.country] || 0) + 1;
+      }
+    });
+
+    setTransactions((prevTransactions) => [...newRows.reverse(), ...prevTransactions]);
+    processFraudData(riskCountsRef.current);
+    processHighRiskCountryData(highRiskCountryCountsRef.current);
   };
 
-  // ✅ Process fraud data for the donut chart (excluding "No Risk")
-  const processFraudData = (data) => {
-    const riskCounts = data.reduce((acc, transaction) => {
-      if (transaction.risk_level !== "No Risk") {
-        acc[transaction.risk_level] = (acc[transaction.risk_level] || 0) + 1;
+  // ✅ Initial load: page through /fraud_cases with keyset cursors instead of one huge response
+  const fetchTransactions = async () => {
+    try {
+      let afterId = 0;
+      let hasMore = true;
+      while (hasMore) {
+        const response = await axios.get(`${API_URL}/fraud_cases`, {
+          params: { after_id: afterId, limit: PAGE_LIMIT },
+        });
+        applyNewRows(response.data.items);
+        hasMore = response.data.has_more;
+        afterId = response.data.next_after_id;
       }
-      return acc;
-    }, {});
+      // ✅ Pick up anything inserted while the pages were loading, then follow live batches
+      initialLoadDoneRef.current = true;
+      await fetchChanges();
+    } catch (error) {
+      console.error("Error fetching transactions", error);
+    }
+  };
+
+  const fetchChanges = async () => {
+    try {
+      let hasMore = true;
+      while (hasMore) {
+        const response = await axios.get(`${API_URL}/fraud_cases/changes`, {
+          params: { since_id: lastIdRef.current },
+        });
+        applyNewRows(response.data.items);
+        hasMore = response.data.has_more;
+      }
+    } catch (error) {
+      console.error("Error fetching changes", error);
+    }
+  };
+
+  // ✅ Process fraud data for the donut chart (excluding "No Risk")
+  const processFraudData = (riskCounts) => {
+    const counts = Object.fromEntries(Object.entries(riskCounts).filter(([risk]) => risk !== "No Risk"));
 
-    const totalCases = Object.values(riskCounts).reduce((sum, count) => sum + count, 0);
-    const chartData = Object.keys(riskCounts).map((risk) => ({
+    const totalCases = Object.values(counts).reduce((sum, count) => sum + count, 0);
+    const chartData = Object.keys(counts).map((risk) => ({
       name: risk,
-      value: riskCounts[risk],
-      percentage: ((riskCounts[risk] / totalCases) * 100).toFixed(1) + "%",
+      value: counts[risk],
+      percentage: ((counts[risk] / totalCases) * 100).toFixed(1) + "%",
     }));
 
     setFraudData(chartData);
   };
 
   // ✅ Process high-risk fraud cases by country (Display All Countries)
-  const processHighRiskCountryData = (data) => {
-    const highRiskCases = data.filter((transaction) => transaction.risk_level === "High Risk");
-  
-    const countryCounts = highRiskCases.reduce((acc, transaction) => {
-      acc[transaction.country] = (acc[transaction.country] || 0) + 1;
-      return acc;
-    }, {});
-  
+  const processHighRiskCountryData = (countryCounts) => {
     // Find the maximum count of high-risk cases in a country
     const maxCases = Math.max(...Object.values(countryCounts));
   
     // Generate color shades based on the highest count
     const allCountries = Object.entries(countryCounts).map(([country, count]) => {
-      const intensity = count / maxCases; // Normalize intensity between 0 and 1
-      const redValue = Math.floor(255 - intensity * 155); // Darker red for higher cases
-  
       return {
         name: country,
         x: Math.random() * 10, // Random x-position to avoid overlapping
@@ -97,7 +150,7 @@ function App() {
 
   const generateFraudSummary = async (clientId) => {
     try {
-      const response = await axios.post("http://127.0.0.1:5000/generate_summary", { client_id: clientId });
+      const response = await axios.post(`${API_URL}/generate_summary`, { client_id: clientId });
 
       if (response.data.error) {
         console.error("Fraud Summary Error:", response.data.error);
@@ -120,10 +173,20 @@ function App() {
     const endDate = dateRange[1].format("YYYY-MM-DD");
 
     try {
-      const response = await axios.post("http://127.0.0.1:5000/generate_report", {
+      // Submit a report job, poll its status, then download the finished PDF
+      let { data: job } = await axios.post(`${API_URL}/reports`, {
         start_date: startDate,
         end_date: endDate,
-      }, { responseType: 'blob' });
+      });
+      while (job.status === "queued" || job.status === "running") {
+        await new Promise((resolve) => setTimeout(resolve, REPORT_POLL_INTERVAL_MS));
+        ({ data: job } = await axios.get(`${API_URL}/reports/${job.job_id}`));
+      }
+      if (job.status !== "done") {
+        throw new Error(job.error || "Report generation failed");
+      }
+
+      const response = await axios.get(`${API_URL}/reports/${job.job_id}/download`, { responseType: 'blob' });
 
       const fileURL = window.URL.createObjectURL(new Blob([response.data]));
       const link = document.createElement("a");
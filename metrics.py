@@ -0,0 +1,249 @@
+"""Low-overhead in-process metrics with Prometheus text exposition, plus a sampling profiler.
+
+``MetricsRegistry`` holds counters, histograms, and callback gauges and counters keyed by label values;
+``render()`` produces the Prometheus text format (version 0.0.4) served on ``/metrics``.
+Recording is a dict lookup, a ``bisect`` and a couple of additions under a per-metric
+lock (about a microsecond), so instrumentation can stay on permanently.
+
+``SamplingProfiler`` snapshots every thread's stack with ``sys._current_frames()`` at a
+fixed interval and aggregates them as collapsed stacks (``frame;frame;frame count``),
+which flamegraph tools read directly. It is off until ``start()`` is called.
+"""
+import math
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+                   30.0, 60.0, 120.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines += [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def time(self, **labels):
+        """Context manager that observes the elapsed seconds of its block."""
+        return _Timer(self, labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Gauge whose samples come from a callback, read only when /metrics is scraped.
+
+    ``fn()`` returns a number, or a dict of label-value tuple -> number for labelled gauges.
+    """
+    TYPE = "gauge"
+
+    def __init__(self, name, documentation, fn, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.fn = fn
+        self.labelnames = tuple(labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        try:
+            value = self.fn()
+        except Exception:
+            return lines  # A failing collector must not break the whole scrape
+        samples = value.items() if isinstance(value, dict) else [((), value)]
+        for key, sample in samples:
+            if sample is not None:
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(sample)}")
+        return lines
+
+
+class CallbackCounter(Gauge):
+    """Counter read from a callback, for cumulative counts a component already keeps
+    (its ``stats()``). The name should end in ``_total``."""
+    TYPE = "counter"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name, documentation, fn, labelnames=()):
+        return self._register(Gauge(name, documentation, fn, labelnames))
+
+    def callback_counter(self, name, documentation, fn, labelnames=()):
+        return self._register(CallbackCounter(name, documentation, fn, labelnames))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class SamplingProfiler:
+    """Statistical profiler: samples all thread stacks every ``interval_ms`` while running."""
+    MIN_INTERVAL_MS = 1.0  # Below this the sampler would mostly measure itself
+
+    def __init__(self, max_depth=64):
+        self.max_depth = max_depth
+        self._stacks = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.samples = 0
+        self.started_at = None
+        self.interval = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval_ms=10, duration_s=None):
+        """Starts sampling (clearing earlier samples); stops by itself after ``duration_s``.
+        Raises ValueError for an interval below ``MIN_INTERVAL_MS`` or a non-positive duration."""
+        if not interval_ms >= self.MIN_INTERVAL_MS:  # Also rejects NaN
+            raise ValueError(f"interval_ms must be at least {self.MIN_INTERVAL_MS:g}")
+        if duration_s is not None and not 0 < duration_s < math.inf:
+            raise ValueError("duration_s must be a positive number")
+        if self.running:
+            return False
+        with self._lock:
+            self._stacks = {}
+            self.samples = 0
+        self.interval = interval_ms / 1000.0
+        self.started_at = time.time()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(duration_s,), name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def collapsed(self, limit=None):
+        """Returns samples as collapsed stacks, most frequent first."""
+        with self._lock:
+            items = sorted(self._stacks.items(), key=lambda item: item[1], reverse=True)
+        return "\n".join(f"{stack} {count}" for stack, count in items[:limit]) + "\n"
+
+    def status(self):
+        return {"running": self.running, "samples": self.samples, "distinct_stacks": len(self._stacks),
+                "started_at": self.started_at, "interval_ms": self.interval * 1000 if self.interval else None}
+
+    def _run(self, duration_s):
+        deadline = time.monotonic() + duration_s if duration_s else None
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            frames = sys._current_frames()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            collected = []
+            for thread_id, frame in frames.items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                collected.append(";".join(reversed(stack)))
+            with self._lock:
+                self.samples += 1
+                for stack in collected:
+                    self._stacks[stack] = self._stacks.get(stack, 0) + 1
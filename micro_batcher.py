@@ -0,0 +1,116 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-record scoring calls into one vectorized model call.
+
+    Callers block in ``submit()`` while a background thread collects requests for up to
+    ``max_wait_ms`` or ``max_batch_size`` records, scores them together with ``score_fn``
+    and hands each result back to its waiting caller.
+
+    The wait is adaptive: when recent batches held a single request (light load) the
+    batch is dispatched as soon as the queue is drained, so idle traffic pays no extra
+    latency. Once concurrent requests start arriving, the worker waits up to
+    ``max_wait_ms`` to fill the batch.
+    """
+
+    def __init__(self, score_fn, max_batch_size=64, max_wait_ms=2.0, max_queue_size=10000):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._avg_batch_size = 1.0
+        self._stats = {
+            "requests": 0,
+            "batches": 0,
+            "errors": 0,
+            "max_batch_size_seen": 0,
+            "max_queue_depth_seen": 0,
+            "batch_size_histogram": {},
+        }
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, record, timeout=None):
+        """Queues one record and blocks until its result (or exception) is ready."""
+        if self._stopped:
+            raise RuntimeError("Micro-batcher is stopped")
+        future = Future()
+        self._queue.put((record, future), timeout=timeout)
+        depth = self._queue.qsize()
+        with self._lock:
+            if depth > self._stats["max_queue_depth_seen"]:
+                self._stats["max_queue_depth_seen"] = depth
+        return future.result(timeout=timeout)
+
+    def stats(self):
+        """Returns a snapshot of queue-depth and batch-size statistics."""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["batch_size_histogram"] = dict(self._stats["batch_size_histogram"])
+        snapshot["queue_depth"] = self._queue.qsize()
+        snapshot["avg_batch_size"] = round(snapshot["requests"] / snapshot["batches"], 2) if snapshot["batches"] else 0
+        snapshot["recent_batch_size"] = round(self._avg_batch_size, 2)
+        snapshot["max_batch_size"] = self.max_batch_size
+        snapshot["max_wait_ms"] = self.max_wait * 1000.0
+        return snapshot
+
+    def close(self):
+        """Stops the worker after it finishes the requests already queued."""
+        self._stopped = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+
+        # ✅ Under light load dispatch immediately; under concurrency wait briefly to fill the batch
+        deadline = time.monotonic() + (self.max_wait if self._avg_batch_size > 1.5 else 0.0)
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # Let the next _collect() see the stop signal
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+
+            records = [record for record, _ in batch]
+            futures = [future for _, future in batch]
+            try:
+                results = self.score_fn(records)
+                for future, result in zip(futures, results):
+                    future.set_result(result)
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                with self._lock:
+                    self._stats["errors"] += 1
+
+            size = len(batch)
+            self._avg_batch_size = 0.8 * self._avg_batch_size + 0.2 * size
+            bucket = str(1 << (size - 1).bit_length())  # Power-of-two histogram buckets
+            with self._lock:
+                self._stats["requests"] += size
+                self._stats["batches"] += 1
+                if size > self._stats["max_batch_size_seen"]:
+                    self._stats["max_batch_size_seen"] = size
+                histogram = self._stats["batch_size_histogram"]
+                histogram[bucket] = histogram.get(bucket, 0) + 1
@@ -0,0 +1,247 @@
+"""Versioned model registry with background loading, validation and atomic hot swap.
+
+A model file is identified by ``model_version(path)`` (file stem plus a content hash),
+so every scored row can record exactly which model produced it. ``ModelRegistry.load()``
+builds a candidate with ``build_fn(model)`` (e.g. a ``FeatureEncoder``), checks it
+against golden samples, warms it up and only then replaces ``current`` in a single
+attribute assignment. Requests read ``registry.current`` once and use that snapshot, so
+in-flight requests finish on the old model while new requests get the new one, and a
+candidate that fails validation never serves traffic.
+
+``preload(path)`` unpickles a model in a parent process before it forks workers
+(``serve.py``), and builds the synthetic matrix used to validate it there too. A worker's
+``load()`` of the same file then reuses both, so the workers share their memory
+copy-on-write and none of them reads the file or dumps the trees again.
+
+Golden samples are a JSON list of ``{"record": {...}, "risk_level": "..."}`` entries.
+Without them a candidate only gets structural checks (class labels, finite probabilities
+of the right shape on a synthetic feature matrix). To write them from a trusted model:
+
+    python model_registry.py fraud_model.pkl accounts.csv --output golden_samples.json [--rows 500]
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+
+import joblib
+import numpy as np
+
+from tree_engine import sample_feature_matrix
+
+PROBE_ROWS = 256  # Synthetic rows every candidate must score with finite probabilities
+
+
+def model_version(path):
+    """Returns ``<file stem>@<first 12 hex chars of the file's SHA-256>``."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return f"{os.path.splitext(os.path.basename(path))[0]}@{digest.hexdigest()[:12]}"
+
+
+_preloaded = {}  # realpath -> (file version, model, probe matrix) built before forking
+
+
+def preload(path):
+    """Unpickles ``path`` for processes forked afterwards to share. Returns its version."""
+    version = model_version(path)
+    model = joblib.load(path)
+    _preloaded.clear()
+    _preloaded[os.path.realpath(path)] = (version, model, sample_feature_matrix(model, PROBE_ROWS))
+    return version
+
+
+def _take_preloaded(path, version):
+    """Returns ``(model, probe matrix)`` preloaded for this exact file, or None."""
+    entry = _preloaded.pop(os.path.realpath(path), None)
+    return entry[1:] if entry is not None and entry[0] == version else None
+
+
+def load_golden_samples(path):
+    if not path or not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+class LoadedModel:
+    """An immutable snapshot: the model, its scoring encoder and its version."""
+
+    def __init__(self, version, path, model, encoder, loaded_at, validation):
+        self.version = version
+        self.path = path
+        self.model = model
+        self.encoder = encoder
+        self.loaded_at = loaded_at
+        self.validation = validation
+
+    def describe(self):
+        return {"version": self.version, "path": self.path, "loaded_at": self.loaded_at,
+                "validation": self.validation}
+
+
+class ModelRegistry:
+    def __init__(self, build_fn, expected_labels, golden_samples=(), min_golden_agreement=1.0, warmup_rounds=20):
+        self.build_fn = build_fn
+        self.expected_labels = set(expected_labels)
+        self.golden_samples = list(golden_samples)
+        self.min_golden_agreement = min_golden_agreement
+        self.warmup_rounds = warmup_rounds
+        self.current = None
+        self._load_lock = threading.Lock()  # One load at a time
+        self._ready = threading.Event()
+        self.last_load = None  # Status of the most recent load attempt
+
+    def wait_until_loaded(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def _validate(self, model, encoder, probe=None):
+        """Raises ValueError if the candidate cannot serve; returns a validation summary."""
+        labels = set(str(label) for label in model.classes_)
+        if labels != self.expected_labels:
+            raise ValueError(f"Model predicts {sorted(labels)}, expected {sorted(self.expected_labels)}")
+
+        summary = {"golden_samples": len(self.golden_samples)}
+        if self.golden_samples:
+            predicted = encoder.predict_many([sample["record"] for sample in self.golden_samples])
+            matches = sum(label == sample["risk_level"] for label, sample in zip(predicted, self.golden_samples))
+            agreement = matches / len(self.golden_samples)
+            summary["golden_agreement"] = round(agreement, 4)
+            if agreement < self.min_golden_agreement:
+                raise ValueError(f"Golden sample agreement {agreement:.2%} is below "
+                                 f"{self.min_golden_agreement:.2%}")
+
+        if probe is None:
+            probe = sample_feature_matrix(model, PROBE_ROWS)
+        proba = encoder.predict_proba(probe)
+        if proba.shape != (len(probe), len(labels)) or not np.all(np.isfinite(proba)):
+            raise ValueError(f"Model returned probabilities of shape {proba.shape} or non-finite values")
+
+        current = self.current
+        if current is not None and self.golden_samples:
+            records = [sample["record"] for sample in self.golden_samples]
+            before = current.encoder.predict_many(records)
+            after = encoder.predict_many(records)
+            summary["agreement_with_previous"] = round(
+                sum(a == b for a, b in zip(before, after)) / len(records), 4)
+        return summary
+
+    def _warm_up(self, encoder):
+        """Runs a few inferences so the first real request does not pay one-off setup costs."""
+        records = [sample["record"] for sample in self.golden_samples[:64]]
+        started = time.perf_counter()
+        if records:
+            for _ in range(self.warmup_rounds):
+                encoder.predict_one(records[0])
+            encoder.predict_many(records)
+        else:
+            row = np.full((1, encoder.num_features), np.nan)
+            for _ in range(self.warmup_rounds):
+                encoder.predict_proba(row)
+        return round((time.perf_counter() - started) * 1000, 2)
+
+    def load(self, path, version=None):
+        """Loads, validates and warms up ``path``, then swaps it in. Raises on failure,
+        leaving the current model in place."""
+        with self._load_lock:
+            return self._load(path, version)
+
+    def _load(self, path, version):
+        started = time.time()
+        self.last_load = {"path": path, "status": "loading", "started_at": started}
+        try:
+            file_version = model_version(path)
+            version = version or file_version
+            model, probe = _take_preloaded(path, file_version) or (joblib.load(path), None)
+            encoder = self.build_fn(model)
+            validation = self._validate(model, encoder, probe)
+            validation["warmup_ms"] = self._warm_up(encoder)
+        except Exception as e:
+            self.last_load.update({"status": "failed", "error": str(e), "finished_at": time.time()})
+            print(f"🚨 Model {path} rejected: {e}")
+            raise
+
+        loaded = LoadedModel(version, path, model, encoder, time.time(), validation)
+        previous = self.current
+        self.current = loaded  # ✅ Atomic swap: new requests see the new model from here on
+        self._ready.set()
+        self.last_load.update({"status": "loaded", "version": version, "finished_at": time.time(),
+                               "previous_version": previous.version if previous else None})
+        print(f"✅ Model {version} loaded ({validation})")
+        return loaded
+
+    def load_async(self, path, version=None):
+        """Starts ``load()`` on a background thread. Returns False if a load is already running."""
+        if not self._load_lock.acquire(blocking=False):
+            return False
+
+        def run():
+            try:
+                self._load(path, version)
+            except Exception:
+                pass  # Recorded in last_load; the current model keeps serving
+            finally:
+                self._load_lock.release()
+
+        threading.Thread(target=run, name="model-loader", daemon=True).start()
+        return True
+
+    def load_until_ready(self, path, version=None, max_delay=30.0):
+        """Startup load on a background thread: a failed attempt (missing file, rejected
+        model) is retried with exponential backoff until some model is serving, either
+        this one or one loaded meanwhile through ``load()``."""
+        def run():
+            delay = 1.0
+            while self.current is None:
+                with self._load_lock:
+                    if self.current is not None:
+                        return
+                    try:
+                        self._load(path, version)
+                        return
+                    except Exception:
+                        pass  # Recorded in last_load
+                print(f"⏳ No model loaded yet; retrying {path} in {delay:.0f}s")
+                time.sleep(delay)
+                delay = min(delay * 2, max_delay)
+
+        threading.Thread(target=run, name="model-loader", daemon=True).start()
+
+    def status(self):
+        current = self.current
+        return {"current": current.describe() if current else None, "last_load": self.last_load}
+
+
+def write_golden_samples(model_path, accounts_path, output, rows=500, categorical_features=None):
+    """Scores the first ``rows`` accounts of a CSV with a trusted model and saves them as golden samples."""
+    import pandas as pd
+
+    from feature_encoder import FeatureEncoder
+
+    encoder = FeatureEncoder(joblib.load(model_path), categorical_features or ["country", "account_type",
+                                                                                  "payment_method"])
+    frame = pd.read_csv(accounts_path, nrows=rows)
+    records = json.loads(frame[encoder.feature_names].to_json(orient="records"))
+    samples = [{"record": record, "risk_level": label} for record, label in zip(records, encoder.predict_many(records))]
+    with open(output, "w") as f:
+        json.dump(samples, f, indent=1)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write golden samples for model validation")
+    parser.add_argument("model", help="Trusted model file, e.g. fraud_model.pkl")
+    parser.add_argument("accounts", help="CSV of accounts with the model's feature columns")
+    parser.add_argument("--output", default="golden_samples.json")
+    parser.add_argument("--rows", type=int, default=500)
+    args = parser.parse_args()
+    samples = write_golden_samples(args.model, args.accounts, args.output, args.rows)
+    print(f"✅ Wrote {len(samples)} golden samples for {model_version(args.model)} to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
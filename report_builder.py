@@ -0,0 +1,196 @@
+"""Sectioned fraud report: deterministic tables plus short per-section LLM narratives.
+
+Every table in the report is rendered by our code from ``rollups.report_stats()`` into
+ReportLab ``Table`` flowables. The LLM only writes the short narrative under each
+section, from a compact prompt holding that section's figures. The narrative calls
+are sent concurrently through a shared executor (whose size is the concurrency limit),
+and the document is assembled in section order, so report latency is roughly that of
+the slowest section.
+
+ReportLab is imported inside the rendering functions, so importing this module (and
+app.py) stays cheap until the first report is actually rendered.
+"""
+import re
+from xml.sax.saxutils import escape
+
+RISK_LEVELS = ["High Risk", "Medium Risk", "Low Risk", "No Risk"]
+
+NARRATIVE_INSTRUCTIONS = (
+    "You are a fraud detection analyst writing one section of a trading fraud report. "
+    "Using only the figures below, write {sentences} in formal business language. "
+    "Do not repeat the table, do not speculate beyond the data, and do not use headings.\n\n"
+    "Section: {title}\nFocus: {focus}\n\nFigures:\n{facts}"
+)
+
+
+def _money(value):
+    return f"${value:,.2f}"
+
+
+def _ratio(numerator, denominator):
+    return numerator / denominator if denominator else 0.0
+
+
+def _overview(stats):
+    rows = [["Metric", "Value"],
+            ["Total Transactions", f"{stats['total_cases']:,}"],
+            ["Earliest Recorded Detection", stats["earliest_detection"] or "-"],
+            ["Latest Recorded Detection", stats["latest_detection"] or "-"]]
+    return rows, [f"{label}: {value}" for label, value in rows[1:]]
+
+
+def _risk_levels(stats):
+    rows = [["Risk Level", "Number of Cases", "Share (%)"]]
+    rows += [[level, f"{stats['risk_counts'][level]:,}", f"{stats['risk_percentages'][level]:.2f}"]
+             for level in RISK_LEVELS]
+    return rows, [f"{level}: {count} cases ({share}%)" for level, count, share in rows[1:]]
+
+
+def _financials(stats):
+    rows = [["Risk Level", "Total Deposits (USD)", "Total Withdrawals (USD)"]]
+    rows += [[level, _money(stats["risk_deposits"][level]), _money(stats["risk_withdrawals"][level])]
+             for level in RISK_LEVELS]
+    rows.append(["All", _money(stats["total_deposits"]), _money(stats["total_withdrawals"])])
+    facts = [f"{level}: deposits {deposits}, withdrawals {withdrawals}" for level, deposits, withdrawals in rows[1:]]
+    facts.append(f"Total fees paid: {_money(stats['total_fees_paid'])}")
+    return rows, facts
+
+
+def _payment_methods(stats):
+    methods = sorted(stats["payment_counts"].items(), key=lambda item: item[1], reverse=True)
+    rows = [["Payment Method", "Cases", "Usage (%)"]]
+    rows += [[method, f"{count:,}", f"{stats['payment_usage'][method]:.2f}"] for method, count in methods]
+    return rows, [f"{method}: {usage}% of cases" for method, _, usage in rows[1:]]
+
+
+def _countries(stats, limit=25):
+    # The countries with the most cases, then one row totalling all the others
+    columns = ("total_cases", "high_risk", "medium_risk", "low_risk", "no_risk")
+    rows = [["Country", "Total", "High", "Medium", "Low", "No Risk"]]
+    rows += [[c["country"], f"{c['total_cases']:,}", c["high_risk"], c["medium_risk"], c["low_risk"], c["no_risk"]]
+             for c in stats["country_data"][:limit]]
+    others = stats["country_data"][limit:]
+    if others:
+        totals = [sum(c[column] for c in others) for column in columns]
+        rows.append([f"Other ({len(others)} more countries)", f"{totals[0]:,}", *totals[1:]])
+    by_high_risk = sorted(stats["country_data"], key=lambda c: c["high_risk"], reverse=True)[:5]
+    facts = [f"{c['country']}: {c['total_cases']} cases" for c in stats["country_data"][:5]]
+    if others:
+        facts.append(f"{len(others)} further countries outside the table: {totals[0]} cases in total")
+    facts += [f"High-risk cases in {c['country']}: {c['high_risk']}" for c in by_high_risk]
+    return rows, facts
+
+
+def _patterns(stats):
+    rows = [["Risk Level", "Avg Deposit (USD)", "Avg Withdrawal (USD)", "Withdrawal / Deposit"]]
+    for level in RISK_LEVELS:
+        count = stats["risk_counts"][level]
+        deposits, withdrawals = stats["risk_deposits"][level], stats["risk_withdrawals"][level]
+        rows.append([level, _money(_ratio(deposits, count)), _money(_ratio(withdrawals, count)),
+                     f"{_ratio(withdrawals, deposits):.2f}"])
+    return rows, [f"{level}: average deposit {avg_deposit}, average withdrawal {avg_withdrawal}, "
+                  f"withdrawal-to-deposit ratio {ratio}" for level, avg_deposit, avg_withdrawal, ratio in rows[1:]]
+
+
+def _key_findings(stats):
+    facts = [f"High-risk share: {stats['risk_percentages']['High Risk']}% of {stats['total_cases']} transactions",
+             f"Medium-risk share: {stats['risk_percentages']['Medium Risk']}%"]
+    if stats["payment_usage"]:
+        method, usage = max(stats["payment_usage"].items(), key=lambda item: item[1])
+        facts.append(f"Most used payment method: {method} ({usage}%)")
+    facts += [f"High-risk cases in {c['country']}: {c['high_risk']}"
+              for c in sorted(stats["country_data"], key=lambda c: c["high_risk"], reverse=True)[:3]]
+    return None, facts
+
+
+# (title, table + facts builder, narrative focus, narrative length)
+REPORT_SECTIONS = [
+    ("Overview", _overview,
+     "the volume of transactions and the detection time span", "2-3 sentences"),
+    ("1. Risk Level Breakdown", _risk_levels,
+     "which risk levels were most prevalent and what stands out for high and medium risk", "3-4 sentences"),
+    ("2. Financial Transactions Breakdown", _financials,
+     "financial trends across risk levels and gaps between deposits and withdrawals", "3-4 sentences"),
+    ("3. Payment Method Usage", _payment_methods,
+     "which payment methods dominate and any anomalies in the distribution", "2-3 sentences"),
+    ("4. Country-Wise Fraud Distribution", _countries,
+     "countries with the most cases and regions with elevated high-risk counts", "3-4 sentences"),
+    ("5. Transaction Patterns by Risk Level", _patterns,
+     "how deposit and withdrawal behaviour differs between risk levels", "3-4 sentences"),
+    ("6. Key Findings", _key_findings,
+     "the most important fraud trends, as a short summary for management", "4-5 sentences"),
+]
+
+
+def build_sections(stats):
+    """Returns ``[(title, table_rows or None, narrative_prompt)]`` in report order."""
+    sections = []
+    for title, builder, focus, sentences in REPORT_SECTIONS:
+        rows, facts = builder(stats)
+        prompt = NARRATIVE_INSTRUCTIONS.format(sentences=sentences, title=title, focus=focus,
+                                               facts="\n".join(f"- {fact}" for fact in facts))
+        sections.append((title, rows, prompt))
+    return sections
+
+
+def generate_narratives(sections, chat_fn, executor):
+    """Runs ``chat_fn(prompt)`` for every section on ``executor``; results keep section order."""
+    futures = [executor.submit(chat_fn, prompt) for _, _, prompt in sections]
+    return [future.result() for future in futures]
+
+
+def _format_bold(text):
+    """Escapes LLM text for ReportLab's paragraph markup, then turns Markdown-style
+    **bold** into <b> tags (so stray tags or ampersands cannot break the PDF)."""
+    return re.sub(r"\*\*(.*?)\*\*", r"<b>\1</b>", escape(text))
+
+
+def _table(rows):
+    from reportlab.lib import colors
+    from reportlab.platypus import Table, TableStyle
+
+    table = Table(rows, repeatRows=1, hAlign="LEFT")
+    table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#2f3b52")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 9),
+        ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f2f4f7")]),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#c8ccd4")),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+        ("TOPPADDING", (0, 0), (-1, -1), 4),
+    ]))
+    return table
+
+
+def render_report(output, title, sections, narratives):
+    """Builds the PDF into ``output`` (a file path or a binary file-like object)."""
+    from reportlab.lib.enums import TA_JUSTIFY
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+    doc = SimpleDocTemplate(output, pagesize=letter,
+                            rightMargin=50, leftMargin=50,
+                            topMargin=50, bottomMargin=50)
+
+    styles = getSampleStyleSheet()
+    styles["BodyText"].alignment = TA_JUSTIFY
+    styles["BodyText"].fontSize = 11
+    styles["BodyText"].leading = 15
+
+    content = [Paragraph(title, styles["Title"]), Spacer(1, 0.2 * inch)]
+    for (section_title, rows, _), narrative in zip(sections, narratives):
+        content.append(Paragraph(section_title, styles["Heading2"]))
+        if rows:
+            content.append(_table(rows))
+            content.append(Spacer(1, 0.15 * inch))
+        for line in narrative.split("\n"):
+            if line.strip():
+                content.append(Paragraph(_format_bold(line.strip()), styles["BodyText"]))
+                content.append(Spacer(1, 0.1 * inch))
+        content.append(Spacer(1, 0.2 * inch))
+
+    doc.build(content)
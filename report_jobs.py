@@ -0,0 +1,240 @@
+import json
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class ReportJob:
+    """State of one submitted report: queued -> running (per stage) -> done / failed."""
+
+    def __init__(self, key, params):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.params = params
+        self.status = "queued"
+        self.stage = None
+        self.cached = False
+        self.error = None
+        self.artifact = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.stage_seconds = {}
+        self._stage_started = None
+        self._done = threading.Event()
+
+    def set_stage(self, stage):
+        """Called by the job function as it moves through its stages (stats, llm, render...)."""
+        now = time.monotonic()
+        if self.stage is not None and self._stage_started is not None:
+            self.stage_seconds[self.stage] = round(now - self._stage_started, 3)
+        self.stage = stage
+        self._stage_started = now
+
+    def _finish(self, status, artifact=None, error=None):
+        self.set_stage(None)
+        self.status = status
+        self.artifact = artifact
+        self.error = error
+        self.finished_at = time.time()
+        self._done.set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "cached": self.cached,
+            "error": self.error,
+            "params": self.params,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "stage_seconds": dict(self.stage_seconds),
+            "size": self.artifact.get("size") if self.artifact else None,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Read-only copy of a job saved by another process (see ``state_dir``)."""
+        job = cls(None, state["params"])
+        job.id = state["job_id"]
+        for name in ("status", "stage", "cached", "error", "created_at", "started_at", "finished_at",
+                     "stage_seconds", "artifact"):
+            setattr(job, name, state.get(name))
+        if job.status in ("done", "failed"):
+            job._done.set()
+        return job
+
+
+class ReportJobQueue:
+    """Runs report jobs on a bounded pool of background workers with an artifact cache.
+
+    ``submit(key, params)`` returns a job immediately. ``key`` identifies the artifact
+    (e.g. date range + data watermark): a finished artifact for the same key is served
+    from the LRU cache without running anything, and a job already queued or running
+    for the key is shared instead of starting a second one. ``run_fn(job)`` does the
+    work, reporting progress with ``job.set_stage()``, and returns the artifact dict.
+    When ``max_pending`` jobs are waiting, ``submit()`` raises ``queue.Full``.
+
+    With ``state_dir``, every status change is also written to ``<state_dir>/<job id>.json``
+    and ``get()`` falls back to those files. Processes sharing the directory can then
+    answer for each other's jobs; artifacts must be files for them to be downloadable.
+    An artifact's ``path`` file is deleted once neither the cache nor a remembered job
+    refers to it.
+    """
+
+    def __init__(self, run_fn, workers=2, max_pending=20, cache_entries=32, max_jobs=1000, state_dir=None):
+        self.run_fn = run_fn
+        self.state_dir = state_dir
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+        self.cache_entries = cache_entries
+        self.max_jobs = max_jobs
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()  # job id -> ReportJob (oldest first)
+        self._active = {}  # key -> queued/running ReportJob
+        self._cache = OrderedDict()  # key -> artifact
+        self._stats = {
+            "submitted": 0,
+            "cache_hits": 0,
+            "shared_jobs": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+        }
+        self._threads = [threading.Thread(target=self._run, name=f"report-worker-{i}", daemon=True)
+                         for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, key, params, is_valid=None):
+        """Returns a job for ``key``: cached, already in flight, or newly queued.
+
+        ``is_valid(artifact)`` can reject a cached artifact (e.g. its file was deleted).
+        """
+        with self._lock:
+            self._stats["submitted"] += 1
+            artifact = self._cache.get(key)
+            if artifact is not None and (is_valid is None or is_valid(artifact)):
+                self._cache.move_to_end(key)
+                self._stats["cache_hits"] += 1
+                job = ReportJob(key, params)
+                job.cached = True
+                job.started_at = job.created_at
+                job._finish("done", artifact)
+                self._remember(job)
+                self._save(job)
+                return job
+            self._release(self._cache.pop(key, None))
+
+            job = self._active.get(key)
+            if job is not None:
+                self._stats["shared_jobs"] += 1
+                return job
+
+            job = ReportJob(key, params)
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                self._stats["submitted"] -= 1
+                self._stats["rejected"] += 1
+                raise
+            self._active[key] = job
+            self._remember(job)
+            self._save(job)
+            return job
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and self.state_dir and re.fullmatch(r"[0-9a-f]{32}", job_id):
+            try:
+                with open(os.path.join(self.state_dir, f"{job_id}.json")) as f:
+                    job = ReportJob.from_state(json.load(f))
+            except (OSError, ValueError):
+                return None
+        return job
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["cached_artifacts"] = len(self._cache)
+            snapshot["active_jobs"] = len(self._active)
+        snapshot["queue_depth"] = self._queue.qsize()
+        snapshot["workers"] = len(self._threads)
+        return snapshot
+
+    def _remember(self, job):
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.max_jobs:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if oldest.status in ("queued", "running"):
+                break
+            del self._jobs[oldest_id]
+            if self.state_dir:
+                try:
+                    os.remove(os.path.join(self.state_dir, f"{oldest_id}.json"))
+                except OSError:
+                    pass
+            self._release(oldest.artifact)
+
+    def _release(self, artifact):
+        """Deletes an artifact's file once nothing refers to it (caller holds the lock)."""
+        if not artifact or "path" not in artifact:
+            return
+        if any(cached is artifact for cached in self._cache.values()) or \
+                any(job.artifact is artifact for job in self._jobs.values()):
+            return
+        try:
+            os.remove(artifact["path"])
+        except OSError:
+            pass
+
+    def _save(self, job):
+        if not self.state_dir:
+            return
+        artifact = {k: v for k, v in job.artifact.items() if k != "data"} if job.artifact else None
+        path = os.path.join(self.state_dir, f"{job.id}.json")
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({**job.to_dict(), "artifact": artifact}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"🚨 Could not save report job {job.id}: {e}")
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            self._save(job)
+            try:
+                artifact = self.run_fn(job)
+            except Exception as e:
+                print(f"🚨 Report job {job.id} failed: {e}")
+                with self._lock:
+                    self._stats["failed"] += 1
+                    self._active.pop(job.key, None)
+                job._finish("failed", error=str(e))
+                self._save(job)
+                continue
+
+            with self._lock:
+                self._stats["completed"] += 1
+                self._active.pop(job.key, None)
+                self._cache[job.key] = artifact
+                self._cache.move_to_end(job.key)
+                job._finish("done", artifact)
+                while len(self._cache) > self.cache_entries:
+                    self._release(self._cache.popitem(last=False)[1])
+            self._save(job)
@@ -0,0 +1,202 @@
+"""Relays Socket.IO emits between worker processes on one host without an external broker.
+
+``serve.py`` runs a ``RelayHub`` in its master process on a Unix socket, and each worker's
+``SocketIO`` uses a ``LocalRelayManager``. Like the Redis and Kombu backends of
+python-socketio, the manager is a ``PubSubManager``. An emit goes straight to the
+worker's own clients and is also published to the hub as a length-prefixed pickle. The
+hub forwards the frame unchanged to every other worker, and each of them emits it to its
+clients. To relay across hosts, set ``SOCKETIO_MESSAGE_QUEUE`` to a Flask-SocketIO broker
+URL instead (``redis://``, ``amqp://``, ``kafka://``).
+"""
+import os
+import pickle
+import selectors
+import socket
+import struct
+import threading
+import time
+
+import socketio
+
+_HEADER = struct.Struct("!I")
+MAX_PENDING_BYTES = 64 << 20  # A worker this far behind is disconnected (it reconnects)
+
+
+class RelayHub:
+    """Forwards every frame received from one peer to all the other peers.
+
+    It does not start a thread. It registers its sockets on ``selector`` with a
+    ``callback(fileobj, mask)`` as the key's data, and the owner's event loop calls them.
+    """
+
+    def __init__(self, path, selector):
+        self.path = path
+        self.selector = selector
+        if os.path.exists(path):
+            os.unlink(path)
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(path)
+        os.chmod(path, 0o600)
+        self.listener.listen(128)
+        self.listener.setblocking(False)
+        selector.register(self.listener, selectors.EVENT_READ, self._accept)
+        self._peers = {}  # socket -> (inbound buffer, outbound buffer)
+        self._stats = {"frames": 0, "bytes": 0, "dropped_peers": 0}
+
+    def _accept(self, listener, mask):
+        try:
+            peer, _ = listener.accept()
+        except BlockingIOError:
+            return
+        peer.setblocking(False)
+        self._peers[peer] = (bytearray(), bytearray())
+        self.selector.register(peer, selectors.EVENT_READ, self._service)
+
+    def _service(self, peer, mask):
+        if mask & selectors.EVENT_WRITE:
+            self._flush(peer)
+        if mask & selectors.EVENT_READ and peer in self._peers:
+            try:
+                data = peer.recv(1 << 16)
+            except BlockingIOError:
+                return
+            except OSError:
+                data = b""
+            if not data:
+                self._drop(peer)
+                return
+            inbound = self._peers[peer][0]
+            inbound += data
+            while len(inbound) >= _HEADER.size:
+                end = _HEADER.size + _HEADER.unpack_from(inbound)[0]
+                if len(inbound) < end:
+                    break
+                frame = bytes(inbound[:end])
+                del inbound[:end]
+                self._forward(peer, frame)
+
+    def _forward(self, sender, frame):
+        self._stats["frames"] += 1
+        self._stats["bytes"] += len(frame)
+        for peer, (_, outbound) in list(self._peers.items()):
+            if peer is sender:
+                continue  # The sender has already emitted to its own clients
+            if len(outbound) + len(frame) > MAX_PENDING_BYTES:
+                self._stats["dropped_peers"] += 1
+                self._drop(peer)
+                continue
+            was_idle = not outbound
+            outbound += frame
+            if was_idle:
+                self._flush(peer)
+
+    def _flush(self, peer):
+        outbound = self._peers[peer][1]
+        try:
+            sent = peer.send(outbound)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self._drop(peer)
+            return
+        del outbound[:sent]
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if outbound else 0)
+        if self.selector.get_key(peer).events != events:
+            self.selector.modify(peer, events, self._service)
+
+    def _drop(self, peer):
+        if self._peers.pop(peer, None) is not None:
+            self.selector.unregister(peer)
+            peer.close()
+
+    def close_after_fork(self):
+        """Closes the inherited sockets in a forked child, leaving the parent's hub running."""
+        for peer in self._peers:
+            peer.close()
+        self._peers = {}
+        self.listener.close()
+
+    def stats(self):
+        return {**self._stats, "peers": len(self._peers)}
+
+    def close(self):
+        for peer in list(self._peers):
+            self._drop(peer)
+        self.selector.unregister(self.listener)
+        self.listener.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class LocalRelayManager(socketio.PubSubManager):
+    """Socket.IO client manager publishing through a ``RelayHub`` at ``local://<socket path>``."""
+
+    name = "local"
+
+    def __init__(self, url, channel="socketio", write_only=False, logger=None, json=None):
+        if not url.startswith("local://"):
+            raise ValueError(f"Expected a local://<socket path> URL, got {url!r}")
+        super().__init__(channel=channel, write_only=write_only, logger=logger, json=json)
+        self.path = url[len("local://"):]
+        self._sock = None
+        self._lock = threading.Lock()  # Guards the connection and serializes writes
+
+    def _connection(self):
+        if self._sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.path)
+            except OSError:
+                sock.close()
+                raise
+            self._sock = sock
+        return self._sock
+
+    def _reset(self, sock):
+        with self._lock:
+            if self._sock is sock:
+                self._sock = None
+        sock.close()
+
+    def _publish(self, data):
+        payload = pickle.dumps(data)
+        frame = _HEADER.pack(len(payload)) + payload
+        for _ in range(2):  # Reconnect once if the hub connection was lost
+            sock = None
+            try:
+                with self._lock:
+                    sock = self._connection()
+                    sock.sendall(frame)
+                return
+            except OSError:
+                if sock is not None:
+                    self._reset(sock)
+        self._get_logger().error("Socket.IO relay at %s is unavailable; %s message dropped",
+                                 self.path, data.get("method"))
+
+    def _listen(self):
+        while True:
+            try:
+                with self._lock:
+                    sock = self._connection()
+            except OSError:
+                time.sleep(1)
+                continue
+            buffer = bytearray()
+            try:
+                while True:
+                    data = sock.recv(1 << 16)
+                    if not data:
+                        break
+                    buffer += data
+                    while len(buffer) >= _HEADER.size:
+                        end = _HEADER.size + _HEADER.unpack_from(buffer)[0]
+                        if len(buffer) < end:
+                            break
+                        message = pickle.loads(bytes(buffer[_HEADER.size:end]))
+                        del buffer[:end]
+                        yield message
+            except OSError:
+                pass
+            self._reset(sock)
+            time.sleep(1)
@@ -0,0 +1,188 @@
+"""Content-addressed cache with single-flight dedupe for LLM fraud summaries.
+
+Entries are keyed by a SHA-256 of the transaction fields, the prompt template and the
+model name, so a summary is reused exactly as long as none of those change. Lookups go
+to an in-memory LRU with TTL first, then to a persistent ``llm_summary_cache`` table so
+the cache survives restarts. Concurrent misses for the same key share one in-flight LLM
+call.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from sqlalchemy import text
+
+
+def summary_cache_key(fields, template, model_name):
+    """SHA-256 over the canonical JSON of the prompt inputs."""
+    payload = json.dumps({"fields": fields, "template": template, "model": model_name},
+                         sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def create_summary_cache_table(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS llm_summary_cache (
+            cache_key CHAR(64) PRIMARY KEY,
+            client_id VARCHAR(50) NOT NULL,
+            model VARCHAR(100) NOT NULL,
+            response TEXT NOT NULL,
+            created_at DOUBLE NOT NULL
+        )
+    """))
+
+
+class SqlSummaryStore:
+    """Persistent backing store in the llm_summary_cache table."""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def load(self, key, max_age):
+        with self.engine.connect() as conn:
+            row = conn.execute(text("""
+                SELECT client_id, response, created_at FROM llm_summary_cache WHERE cache_key = :key
+            """), {"key": key}).first()
+        if row is None or time.time() - row.created_at > max_age:
+            return None
+        return row.client_id, row.response
+
+    def save(self, key, client_id, model_name, response):
+        """Single-statement upsert, so concurrent writers of the same key cannot collide."""
+        insert_sql = """
+            INSERT INTO llm_summary_cache (cache_key, client_id, model, response, created_at)
+            VALUES (:key, :client_id, :model, :response, :created_at)
+        """
+        with self.engine.connect() as conn:
+            if conn.dialect.name == "mysql":
+                upsert_sql = insert_sql + """
+            ON DUPLICATE KEY UPDATE client_id = VALUES(client_id), model = VALUES(model),
+                response = VALUES(response), created_at = VALUES(created_at)
+                """
+            else:
+                upsert_sql = insert_sql + """
+            ON CONFLICT (cache_key) DO UPDATE SET client_id = excluded.client_id, model = excluded.model,
+                response = excluded.response, created_at = excluded.created_at
+                """
+            conn.execute(text(upsert_sql), {"key": key, "client_id": client_id, "model": model_name,
+                                            "response": response, "created_at": time.time()})
+            conn.commit()
+
+    def delete(self, client_id=None):
+        with self.engine.connect() as conn:
+            if client_id is None:
+                result = conn.execute(text("DELETE FROM llm_summary_cache"))
+            else:
+                result = conn.execute(text("DELETE FROM llm_summary_cache WHERE client_id = :client_id"),
+                                      {"client_id": client_id})
+            conn.commit()
+        return result.rowcount
+
+
+class SummaryCache:
+    """In-memory LRU + TTL in front of a persistent store, with single-flight misses."""
+
+    def __init__(self, store=None, max_entries=1024, ttl_seconds=3600, persistent_ttl_seconds=7 * 24 * 3600):
+        self.store = store
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.persistent_ttl = persistent_ttl_seconds
+        self._entries = OrderedDict()  # key -> (expires_at, client_id, value)
+        self._inflight = {}  # key -> Future
+        self._lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "persistent_hits": 0,
+            "misses": 0,
+            "shared_inflight": 0,
+            "errors": 0,
+            "persist_errors": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    def _remember(self, key, client_id, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, client_id, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def get_or_compute(self, key, client_id, model_name, compute):
+        """Returns ``(value, source)`` where source is memory / persistent / computed / shared."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return entry[2], "memory"
+                del self._entries[key]
+
+            future = self._inflight.get(key)
+            if future is not None:
+                self._stats["shared_inflight"] += 1
+                leader = False
+            else:
+                future = self._inflight[key] = Future()
+                leader = True
+
+        if not leader:
+            return future.result(), "shared"
+
+        try:
+            source = "persistent"
+            stored = self.store.load(key, self.persistent_ttl) if self.store is not None else None
+            if stored is not None:
+                value = stored[1]
+            else:
+                source = "computed"
+                value = compute()
+                if self.store is not None:
+                    try:
+                        self.store.save(key, client_id, model_name, value)
+                    except Exception as e:  # The summary is still good; only persistence failed
+                        with self._lock:
+                            self._stats["persist_errors"] += 1
+                        print(f"🚨 Could not persist summary {key[:12]}: {e}")
+            self._remember(key, client_id, value)
+            with self._lock:
+                self._stats["persistent_hits" if source == "persistent" else "misses"] += 1
+            future.set_result(value)
+            return value, source
+        except Exception as e:
+            with self._lock:
+                self._stats["errors"] += 1
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def invalidate(self, client_id=None):
+        """Drops cached summaries for one client (or every client) from memory and the store."""
+        with self._lock:
+            if client_id is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                keys = [key for key, entry in self._entries.items() if entry[1] == client_id]
+                for key in keys:
+                    del self._entries[key]
+                removed = len(keys)
+            self._stats["invalidations"] += 1
+        persisted = self.store.delete(client_id) if self.store is not None else 0
+        return {"memory_entries_removed": removed, "persistent_entries_removed": persisted}
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["entries"] = len(self._entries)
+            snapshot["inflight"] = len(self._inflight)
+        lookups = snapshot["memory_hits"] + snapshot["persistent_hits"] + snapshot["misses"] + snapshot["shared_inflight"]
+        snapshot["hit_ratio"] = round((lookups - snapshot["misses"]) / lookups, 4) if lookups else 0
+        return snapshot
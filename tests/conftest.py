@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, "benchmarks"))
+
+from synthetic import account_records, generate_accounts, train_stub_model  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def stub_model():
+    """Small LGBMClassifier trained on synthetic accounts, standing in for fraud_model.pkl."""
+    return train_stub_model(generate_accounts(3000))
+
+
+@pytest.fixture(scope="session")
+def records():
+    """Unseen synthetic /predict records, in the key order the API receives them."""
+    return account_records(generate_accounts(300, seed=7))
+
+
+@pytest.fixture(scope="session")
+def app_module(tmp_path_factory, stub_model):
+    """app.py imported against a scratch SQLite database and the stub model, once per session."""
+    import joblib
+
+    workdir = tmp_path_factory.mktemp("app")
+    joblib.dump(stub_model, workdir / "fraud_model.pkl")
+    os.environ["DB_URL"] = f"sqlite:///{workdir / 'fraud_cases.db'}"
+    os.environ["MODEL_PATH"] = str(workdir / "fraud_model.pkl")
+    import app
+
+    assert app.wait_until_ready(120), "app did not become ready"
+    return app
@@ -0,0 +1,28 @@
+import pytest
+
+
+@pytest.mark.parametrize("query, error", [
+    ("since_id=abc", "since_id must be a non-negative integer"),
+    ("since_id=-1", "since_id must be a non-negative integer"),
+    ("since_id=1.5", "since_id must be a non-negative integer"),
+    ("limit=abc", "limit must be an integer between 1 and 1000"),
+    ("limit=0", "limit must be an integer between 1 and 1000"),
+    ("limit=-5", "limit must be an integer between 1 and 1000"),
+    ("limit=1001", "limit must be an integer between 1 and 1000"),
+])
+def test_changes_rejects_invalid_arguments(app_module, query, error):
+    response = app_module.app.test_client().get(f"/fraud_cases/changes?{query}")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": error}
+
+
+def test_changes_pages_by_id(app_module, records):
+    client = app_module.app.test_client()
+    since_id = client.get("/fraud_cases/changes?limit=1000").get_json()["latest_id"]
+    assert client.post("/predict_batch", json=records[:5]).get_json()["scored"] == 5
+
+    first = client.get(f"/fraud_cases/changes?since_id={since_id}&limit=3").get_json()
+    assert len(first["items"]) == 3 and first["has_more"]
+    rest = client.get(f"/fraud_cases/changes?since_id={first['latest_id']}&limit=1000").get_json()
+    ids = [item["id"] for item in first["items"] + rest["items"]]
+    assert ids == sorted(ids) and len(ids) == 5 and ids[0] > since_id
@@ -0,0 +1,49 @@
+import random
+
+import numpy as np
+import pandas as pd
+
+from feature_encoder import FeatureEncoder
+from synthetic import CATEGORICAL_FEATURES
+
+
+def training_frame(model, records):
+    """The records laid out exactly as at training time: training column order, and
+    categoricals carrying the training categories (``booster.pandas_categorical``)."""
+    feature_names = model.booster_.feature_name()
+    frame = pd.DataFrame(records)[feature_names]
+    categorical_columns = [name for name in feature_names if name in CATEGORICAL_FEATURES]
+    for name, categories in zip(categorical_columns, model.booster_.pandas_categorical):
+        frame[name] = pd.Categorical(frame[name], categories=categories)
+    return frame
+
+
+def test_category_codes_match_training_categories(stub_model):
+    encoder = FeatureEncoder(stub_model, CATEGORICAL_FEATURES)
+    categorical_columns = [name for name in encoder.feature_names if name in CATEGORICAL_FEATURES]
+    assert list(encoder.category_codes) == categorical_columns
+    for name, categories in zip(categorical_columns, stub_model.booster_.pandas_categorical):
+        assert encoder.category_codes[name] == {str(value): float(code) for code, value in enumerate(categories)}
+
+
+def test_predictions_match_training_layout(stub_model, records):
+    encoder = FeatureEncoder(stub_model, CATEGORICAL_FEATURES)
+    expected = stub_model.predict_proba(training_frame(stub_model, records))
+    proba = encoder.predict_proba(encoder.encode_many(records))
+    assert np.max(np.abs(proba - expected)) <= 1e-12
+    assert encoder.predict_many(records) == [str(label) for label in stub_model.classes_[expected.argmax(axis=1)]]
+    assert [encoder.predict_one(record) for record in records] == encoder.predict_many(records)
+
+
+def test_request_key_order_does_not_change_predictions(stub_model, records):
+    """The pre-encoder path built a frame in request key order, which LightGBM reads by position."""
+    encoder = FeatureEncoder(stub_model, CATEGORICAL_FEATURES)
+    rng = random.Random(3)
+    shuffled = [dict(rng.sample(list(record.items()), len(record))) for record in records]
+    assert encoder.predict_many(shuffled) == encoder.predict_many(records)
+
+
+def test_unseen_category_is_missing(stub_model, records):
+    encoder = FeatureEncoder(stub_model, CATEGORICAL_FEATURES)
+    row = encoder.encode_one({**records[0], "country": "Atlantis"})
+    assert np.isnan(row[0, encoder.feature_names.index("country")])
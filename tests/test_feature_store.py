@@ -0,0 +1,113 @@
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, text
+
+import feature_store as fs
+from feature_store import FeatureStore, MALAYSIA_TZ
+from fraud_cases_store import insert_fraud_cases
+from migrations import migrate
+
+HOUR = 3600.0
+NOW = 1_800_000_000.0  # Fixed clock, aligned to every bucket width
+
+
+def row(client_id, deposit, ts):
+    return {"client_id": client_id, "country": "Malaysia", "account_type": "Standard", "deposit_amount": deposit,
+            "withdrawal_amount": 1, "num_trades": 2, "avg_trade_amount": 10, "trade_duration": 5,
+            "total_profit": 0, "fees_paid": 1.0, "payment_method": "Bank Transfer", "risk_level": "Low Risk",
+            "model_version": "test",
+            "detection_timestamp": datetime.fromtimestamp(ts, MALAYSIA_TZ).strftime("%Y-%m-%d %H:%M:%S")}
+
+
+def record(store, row_, ts):
+    return store.record(row_["client_id"], float(row_["deposit_amount"]), float(row_["withdrawal_amount"]),
+                        float(row_["num_trades"]), ts=ts)
+
+
+def write(store, engine, rows):
+    with engine.connect() as conn, store.writing(rows):
+        insert_fraud_cases(conn, rows)
+        conn.commit()
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fraud_cases.db'}")
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=WAL")  # Commits during a streaming rebuild, as on MySQL
+    migrate(engine)
+    return engine
+
+
+def test_window_sums_slide_with_time():
+    store = FeatureStore()
+    store.record("c1", 100.0, 0.0, 1.0, ts=NOW - 30 * HOUR)
+    store.record("c1", 10.0, 0.0, 1.0, ts=NOW - 2 * HOUR)
+    features = store.record("c1", 1.0, 5.0, 3.0, ts=NOW)
+    assert (features["txn_count_1h"], features["deposit_sum_1h"], features["withdrawal_sum_1h"]) == (1, 1, 5)
+    assert (features["txn_count_24h"], features["deposit_sum_24h"]) == (2, 11)
+    assert (features["txn_count_7d"], features["deposit_sum_7d"], features["trades_sum_7d"]) == (3, 111, 5)
+    later = store.features("c1", ts=NOW + 2 * HOUR)
+    assert (later["txn_count_1h"], later["txn_count_24h"], later["txn_count_7d"]) == (0, 2, 3)
+    assert store.features("c1", ts=NOW + 8 * 24 * HOUR)["txn_count_7d"] == 0
+    assert store.features("unknown", ts=NOW) == dict.fromkeys(fs.FEATURE_NAMES, 0.0)
+
+
+def test_eviction_by_client_cap_and_idle_time():
+    store = FeatureStore(max_clients=2, idle_seconds=HOUR)
+    store.record("c1", 1.0, 0.0, 1.0, ts=NOW)
+    store.record("c2", 1.0, 0.0, 1.0, ts=NOW)
+    store.record("c1", 1.0, 0.0, 1.0, ts=NOW + 1)  # c2 is now the least recently seen
+    store.record("c3", 1.0, 0.0, 1.0, ts=NOW + 2)
+    assert store.features("c2", ts=NOW + 2)["txn_count_1h"] == 0
+    assert store.features("c1", ts=NOW + 2)["txn_count_1h"] == 2
+    store.record("c4", 1.0, 0.0, 1.0, ts=NOW + 2 * HOUR)  # c1 and c3 idle for over an hour
+    assert store.stats()["clients"] == 1 and store.stats()["evictions"] == 3
+
+
+def test_discard_takes_back_only_unwritten_transactions(engine):
+    store = FeatureStore()
+    written, failed = row("c1", 100, NOW), row("c1", 7, NOW)
+    record(store, written, NOW)
+    record(store, failed, NOW)
+    write(store, engine, [written])
+    store.discard("c1", 7.0, 1.0, 2.0, ts=NOW)
+    store.discard("c1", 100.0, 1.0, 2.0, ts=NOW)  # Already written: kept
+    features = store.features("c1", ts=NOW)
+    assert (features["txn_count_1h"], features["deposit_sum_1h"]) == (1, 100)
+
+
+def test_rebuild_counts_each_transaction_once(engine, monkeypatch):
+    store = FeatureStore()
+    now = time.time()
+    committed = [row("c1", 10, now - 2 * HOUR), row("c1", 20, now - 30 * HOUR), row("c2", 5, now - 9 * 24 * HOUR)]
+    for r in committed:
+        record(store, r, now)
+    write(store, engine, committed)
+    in_flight = row("c1", 300, now)  # Recorded before the rebuild, committed after its snapshot
+    record(store, in_flight, now)
+
+    during = row("c1", 4000, now)  # Recorded and committed while the rebuild streams rows
+    epoch = fs._epoch
+
+    def record_during_rebuild(timestamp):
+        if store._pending is not None and not during.get("done"):
+            during["done"] = True
+            record(store, during, now)
+            write(store, engine, [{k: v for k, v in during.items() if k != "done"}])
+        return epoch(timestamp)
+
+    monkeypatch.setattr(fs, "_epoch", record_during_rebuild)
+    with engine.connect() as conn:
+        assert store.rebuild(conn, now=now) == 2  # c2's row is older than 7 days
+    write(store, engine, [in_flight])
+
+    features = store.features("c1", ts=now)
+    assert features["txn_count_7d"] == 4
+    assert features["deposit_sum_7d"] == 10 + 20 + 300 + 4000
+    assert features["deposit_sum_1h"] == 300 + 4000
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM fraud_cases")).scalar() == 5
+    assert store.features("c2", ts=now)["txn_count_7d"] == 0
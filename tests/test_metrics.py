@@ -0,0 +1,50 @@
+import pytest
+
+from metrics import MetricsRegistry, SamplingProfiler
+
+
+def test_callback_counter_renders_as_counter():
+    registry = MetricsRegistry()
+    registry.callback_counter("fraud_component_events_total", "Events", lambda: {("cache", "hits"): 3},
+                              ["component", "event"])
+    assert registry.render().splitlines() == [
+        "# HELP fraud_component_events_total Events",
+        "# TYPE fraud_component_events_total counter",
+        'fraud_component_events_total{component="cache",event="hits"} 3',
+    ]
+
+
+def test_metrics_endpoint_exposes_component_events_as_counter(app_module):
+    body = app_module.app.test_client().get("/metrics").get_data(as_text=True)
+    assert "# TYPE fraud_component_events_total counter" in body
+    assert "# TYPE fraud_component_events gauge" not in body
+
+
+@pytest.mark.parametrize("interval_ms, duration_s", [(0.5, None), (0, None), (float("nan"), None), (10, 0), (10, -1)])
+def test_profiler_rejects_bad_arguments(interval_ms, duration_s):
+    with pytest.raises(ValueError):
+        SamplingProfiler().start(interval_ms=interval_ms, duration_s=duration_s)
+
+
+@pytest.mark.parametrize("payload, error", [
+    ({"interval_ms": "fast"}, "interval_ms must be a number"),
+    ({"interval_ms": None}, "interval_ms must be a number"),
+    ({"interval_ms": 0.01}, "interval_ms must be at least 1"),
+    ({"interval_ms": 10, "duration_s": "long"}, "duration_s must be a number"),
+    ({"interval_ms": 10, "duration_s": 0}, "duration_s must be a positive number"),
+])
+def test_profiler_endpoint_validates_payload(app_module, monkeypatch, payload, error):
+    monkeypatch.setattr(app_module, "PROFILER_ENABLED", True)
+    response = app_module.app.test_client().post("/profiler", json=payload)
+    assert response.status_code == 400
+    assert response.get_json() == {"error": error}
+    assert not app_module.profiler.running
+
+
+def test_profiler_endpoint_samples(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "PROFILER_ENABLED", True)
+    client = app_module.app.test_client()
+    response = client.post("/profiler", json={"interval_ms": 1, "duration_s": 5})
+    assert response.status_code == 200 and response.get_json()["started"]
+    client.delete("/profiler")
+    assert client.get("/profiler?format=status").get_json()["running"] is False
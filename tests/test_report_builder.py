@@ -0,0 +1,22 @@
+from report_builder import _countries
+
+
+def country(name, total):
+    return {"country": name, "total_cases": total, "high_risk": 1, "medium_risk": 2, "low_risk": 3,
+            "no_risk": total - 6}
+
+
+def test_countries_table_totals_countries_beyond_the_limit():
+    stats = {"country_data": [country(f"Country {i}", 1000 - i) for i in range(30)]}
+    rows, facts = _countries(stats, limit=25)
+    assert len(rows) == 1 + 25 + 1
+    assert rows[-1] == ["Other (5 more countries)", f"{sum(1000 - i for i in range(25, 30)):,}", 5, 10, 15,
+                        sum(1000 - i - 6 for i in range(25, 30))]
+    assert sum(int(row[1].replace(",", "")) for row in rows[1:]) == sum(c["total_cases"] for c in stats["country_data"])
+    assert "5 further countries outside the table: 4865 cases in total" in facts
+
+
+def test_countries_table_without_overflow_has_no_other_row():
+    rows, facts = _countries({"country_data": [country("Malaysia", 10), country("Singapore", 8)]})
+    assert [row[0] for row in rows] == ["Country", "Malaysia", "Singapore"]
+    assert not any("further countries" in fact for fact in facts)
@@ -0,0 +1,38 @@
+from sqlalchemy import create_engine, text
+
+from fraud_cases_store import insert_fraud_cases, normalize_row
+from migrations import migrate
+from rollups import rebuild_rollups
+
+ROLLUP_COLUMNS = "day, risk_level, country, payment_method, case_count, deposit_sum, withdrawal_sum, ROUND(fees_sum, 6)"
+
+
+def rollup_rows(conn):
+    return conn.execute(text(f"SELECT {ROLLUP_COLUMNS} FROM fraud_case_rollups ORDER BY 1, 2, 3, 4")).all()
+
+
+def test_normalize_rounds_int_columns_like_mysql(records):
+    row = normalize_row({**records[0], "deposit_amount": 2.5, "withdrawal_amount": -2.5, "num_trades": 3.4,
+                         "fees_paid": 1})
+    assert (row["deposit_amount"], row["withdrawal_amount"], row["num_trades"]) == (3, -3, 3)
+    assert isinstance(row["fees_paid"], float)
+
+
+def test_rollups_aggregate_the_stored_values(tmp_path, records):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fraud_cases.db'}")
+    migrate(engine)
+    rows = [{**record, "detection_timestamp": f"2026-01-0{1 + i % 3} 10:00:00", "risk_level": "Low Risk",
+             "model_version": "test", "deposit_amount": record["deposit_amount"] + 0.5,
+             "withdrawal_amount": record["withdrawal_amount"] + 0.7}
+            for i, record in enumerate(records[:60])]
+    with engine.connect() as conn:
+        insert_fraud_cases(conn, rows)
+        conn.commit()
+        raw = conn.execute(text("SELECT SUM(deposit_amount), SUM(withdrawal_amount) FROM fraud_cases")).one()
+        assert conn.execute(text("SELECT SUM(deposit_sum), SUM(withdrawal_sum) FROM fraud_case_rollups")).one() == raw
+        assert raw[0] == sum(normalize_row(row)["deposit_amount"] for row in rows)
+
+        incremental = rollup_rows(conn)
+        rebuild_rollups(conn)
+        conn.commit()
+        assert rollup_rows(conn) == incremental
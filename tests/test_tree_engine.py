@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from feature_encoder import FeatureEncoder
+from synthetic import CATEGORICAL_FEATURES, generate_accounts
+from tree_engine import CompiledEnsemble, check_parity, sample_feature_matrix
+
+ATOL = 1e-12
+
+
+@pytest.fixture(scope="module")
+def engine(stub_model):
+    return CompiledEnsemble.from_model(stub_model)
+
+
+@pytest.mark.parametrize("n,seed", [(1, 0), (100, 1), (10000, 2)])
+def test_parity_on_generated_matrices(stub_model, engine, n, seed):
+    """Covers NaNs, unseen category codes and values exactly on split thresholds."""
+    ok, max_diff = check_parity(stub_model, sample_feature_matrix(stub_model, n, seed=seed), engine, atol=ATOL)
+    assert max_diff <= ATOL
+    assert ok
+
+
+def test_labels_match_model_on_encoded_records(stub_model, engine, records):
+    X = FeatureEncoder(stub_model, CATEGORICAL_FEATURES).encode_many(records)
+    ok, max_diff = check_parity(stub_model, X, engine, atol=ATOL)
+    assert ok and max_diff <= ATOL
+    expected = stub_model.classes_[np.argmax(stub_model.booster_.predict(X), axis=1)]
+    assert np.array_equal(engine.predict(X), expected)
+
+
+def test_parity_for_binary_model():
+    import lightgbm as lgb
+
+    accounts = generate_accounts(2000, seed=5)
+    X = accounts[["deposit_amount", "withdrawal_amount", "num_trades", "trade_duration", "total_profit"]]
+    model = lgb.LGBMClassifier(n_estimators=40, verbose=-1).fit(X, accounts["risk_level"] == "High Risk")
+    ok, max_diff = check_parity(model, sample_feature_matrix(model, 5000, seed=9), atol=ATOL)
+    assert ok and max_diff <= ATOL
@@ -0,0 +1,63 @@
+import pytest
+
+
+def valid_record(records):
+    return dict(records[0])
+
+
+@pytest.mark.parametrize("field, value", [
+    ("deposit_amount", "12.5"),
+    ("deposit_amount", "nan"),
+    ("fees_paid", "Infinity"),
+    ("fees_paid", float("nan")),
+    ("fees_paid", float("inf")),
+    ("withdrawal_amount", 1e300),
+    ("num_trades", True),
+    ("num_trades", None),
+])
+def test_rejects_non_finite_or_non_numeric_values(app_module, records, field, value):
+    record = {**valid_record(records), field: value}
+    assert app_module.validate_record(record) is not None
+
+
+def test_integer_fields_must_be_integral(app_module, records):
+    record = valid_record(records)
+    assert app_module.validate_record({**record, "num_trades": 3.5}) == "Field 'num_trades' must be an integer"
+    assert app_module.validate_record({**record, "num_trades": 3.0}) is None
+    assert app_module.validate_record({**record, "fees_paid": 3.5}) is None
+
+
+@pytest.mark.parametrize("field", ["client_id", "country", "account_type", "payment_method"])
+@pytest.mark.parametrize("value", ["", "   ", 7, None, "x" * 101])
+def test_string_fields_must_be_non_empty_strings(app_module, records, field, value):
+    record = {**valid_record(records), field: value}
+    assert app_module.validate_record(record) is not None
+
+
+def test_valid_record_passes(app_module, records):
+    assert all(app_module.validate_record(record) is None for record in records[:50])
+
+
+def test_predict_rejects_numeric_string(app_module, records):
+    client = app_module.app.test_client()
+    response = client.post("/predict", json={**valid_record(records), "deposit_amount": "12.5"})
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Field 'deposit_amount' must be a number"}
+
+
+def test_predict_batch_reports_bad_records_individually(app_module, records):
+    client = app_module.app.test_client()
+    batch = [
+        valid_record(records),
+        {**valid_record(records), "deposit_amount": "12.5"},
+        {**valid_record(records), "country": ""},
+        {**valid_record(records), "num_trades": 2.5},
+        {**valid_record(records), "fees_paid": 1e300},
+    ]
+    response = client.post("/predict_batch", json=batch)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["scored"] == 1 and body["failed"] == 4
+    assert "risk_level" in body["results"][0]
+    assert [result["index"] for result in body["results"][1:]] == [1, 2, 3, 4]
+    assert all("error" in result for result in body["results"][1:])
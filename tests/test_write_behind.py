@@ -0,0 +1,94 @@
+import queue
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from fraud_cases_store import insert_fraud_cases, malaysia_now
+from migrations import migrate
+from write_behind import WriteBehindWriter
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fraud_cases.db'}")
+    migrate(engine)
+    return engine
+
+
+def scored_rows(records, count):
+    return [{**records[i % len(records)], "detection_timestamp": malaysia_now(), "risk_level": "Low Risk",
+             "model_version": "test"} for i in range(count)]
+
+
+def sqlite_writer(engine, **kwargs):
+    def flush(rows):
+        with engine.connect() as conn:
+            insert_fraud_cases(conn, rows)
+            conn.commit()
+    return WriteBehindWriter(flush, **kwargs)
+
+
+def row_count(engine):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT COUNT(*) FROM fraud_cases")).scalar()
+
+
+def test_flushes_every_row_to_sqlite(engine, records):
+    writer = sqlite_writer(engine, max_queue_size=100, flush_rows=7, flush_interval_ms=5)
+    for start in range(0, 250, 25):
+        writer.submit_many(scored_rows(records, 25))
+    assert writer.wait_until_flushed(10)
+    writer.close(10)
+    stats = writer.stats()
+    assert row_count(engine) == 250
+    assert stats["rows_written"] == 250 and stats["rows_dropped"] == 0 and stats["queue_depth"] == 0
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT SUM(case_count) FROM fraud_case_rollups")).scalar() == 250
+
+
+def test_overflow_rejects_the_whole_batch(engine, records):
+    flushing, release = threading.Event(), threading.Event()
+
+    def blocked_flush(rows):
+        flushing.set()
+        release.wait(10)
+        with engine.connect() as conn:
+            insert_fraud_cases(conn, rows)
+            conn.commit()
+
+    writer = WriteBehindWriter(blocked_flush, max_queue_size=10, flush_rows=1, flush_interval_ms=1,
+                               put_timeout=0.05)
+    writer.submit_many(scored_rows(records, 1))  # Taken by the writer thread, which blocks in flush
+    assert flushing.wait(10)
+    writer.submit_many(scored_rows(records, 8))
+    with pytest.raises(queue.Full):
+        writer.submit_many(scored_rows(records, 5))  # Room for 2 more, not 5: nothing is queued
+    stats = writer.stats()
+    assert stats["rejected_rows"] == 5
+    assert stats["rows_submitted"] == 9
+    assert stats["queue_depth"] == 8
+
+    writer.submit_many(scored_rows(records, 2))  # Still fits
+    release.set()
+    assert writer.wait_until_flushed(10)
+    writer.close(10)
+    assert row_count(engine) == 11
+    assert writer.stats()["rows_written"] == 11
+
+
+def test_batch_larger_than_queue_is_admitted_when_empty(engine, records):
+    writer = sqlite_writer(engine, max_queue_size=10, flush_rows=4, flush_interval_ms=1)
+    writer.submit_many(scored_rows(records, 25))
+    assert writer.wait_until_flushed(10)
+    writer.close(10)
+    assert row_count(engine) == 25
+
+
+def test_close_flushes_queued_rows_and_refuses_new_ones(engine, records):
+    writer = sqlite_writer(engine, max_queue_size=100, flush_rows=50, flush_interval_ms=10000)
+    writer.submit_many(scored_rows(records, 30))
+    writer.close(10)
+    assert row_count(engine) == 30
+    with pytest.raises(RuntimeError):
+        writer.submit_many(scored_rows(records, 1))
@@ -0,0 +1,263 @@
+import numpy as np
+
+# Missing-value handling codes, matching LightGBM's MissingType
+MISSING_NONE, MISSING_ZERO, MISSING_NAN = 0, 1, 2
+_MISSING_TYPES = {"None": MISSING_NONE, "Zero": MISSING_ZERO, "NaN": MISSING_NAN}
+_ZERO_THRESHOLD = float(np.float32(1e-35))  # LightGBM's kZeroThreshold is the float 1e-35f
+
+
+class CompiledEnsemble:
+    """A LightGBM tree ensemble flattened into contiguous NumPy arrays.
+
+    Every node of every tree lives in one set of parallel arrays (split feature,
+    threshold, categorical bitset slice, missing-value handling, children, leaf value).
+    Leaves point to themselves, so ``predict_raw`` can advance all (row, tree) pairs one
+    level at a time with vectorized gathers until the deepest tree is exhausted.
+    Decisions follow LightGBM's ``NumericalDecision`` / ``CategoricalDecision`` rules,
+    so the output matches ``Booster.predict`` on the same float64 feature matrix.
+    """
+
+    def __init__(self, dump, classes=None):
+        self.num_class = dump["num_class"]
+        self.num_tree_per_iteration = dump["num_tree_per_iteration"]
+        self.feature_names = list(dump["feature_names"])
+        self.average_output = bool(dump.get("average_output", False))
+        self.classes = None if classes is None else np.asarray(classes)
+        self._parse_objective(dump.get("objective", "regression"))
+
+        split_feature, threshold, default_left, missing_type = [], [], [], []
+        is_categorical, cat_offset, cat_words = [], [], []
+        left, right, leaf_value = [], [], []
+        bitsets = []
+        roots, depths = [], []
+
+        def add_node(node, depth):
+            index = len(split_feature)
+            split_feature.append(-1)
+            threshold.append(0.0)
+            default_left.append(False)
+            missing_type.append(MISSING_NONE)
+            is_categorical.append(False)
+            cat_offset.append(0)
+            cat_words.append(0)
+            left.append(index)
+            right.append(index)
+            leaf_value.append(0.0)
+
+            if "split_index" not in node:
+                if "leaf_coeff" in node:
+                    raise NotImplementedError("Linear trees are not supported")
+                leaf_value[index] = float(node["leaf_value"])
+                return index, depth
+
+            split_feature[index] = int(node["split_feature"])
+            default_left[index] = bool(node["default_left"])
+            missing_type[index] = _MISSING_TYPES[node["missing_type"]]
+            if node["decision_type"] == "==":
+                categories = [int(c) for c in str(node["threshold"]).split("||")]
+                words = max(categories) // 32 + 1
+                bits = np.zeros(words, dtype=np.uint32)
+                for c in categories:
+                    bits[c // 32] |= np.uint32(1 << (c % 32))
+                is_categorical[index] = True
+                cat_offset[index] = sum(len(b) for b in bitsets)
+                cat_words[index] = words
+                bitsets.append(bits)
+            else:
+                threshold[index] = float(node["threshold"])
+
+            left[index], left_depth = add_node(node["left_child"], depth + 1)
+            right[index], right_depth = add_node(node["right_child"], depth + 1)
+            return index, max(left_depth, right_depth)
+
+        for tree in dump["tree_info"]:
+            root, depth = add_node(tree["tree_structure"], 0)
+            roots.append(root)
+            depths.append(depth)
+
+        self.split_feature = np.asarray(split_feature, dtype=np.int32)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.default_left = np.asarray(default_left, dtype=bool)
+        self.missing_type = np.asarray(missing_type, dtype=np.int8)
+        self.is_categorical = np.asarray(is_categorical, dtype=bool)
+        self.cat_offset = np.asarray(cat_offset, dtype=np.int64)
+        self.cat_words = np.asarray(cat_words, dtype=np.int64)
+        self.cat_bitset = np.concatenate(bitsets) if bitsets else np.zeros(1, dtype=np.uint32)
+        self.left_child = np.asarray(left, dtype=np.int32)
+        self.right_child = np.asarray(right, dtype=np.int32)
+        self.leaf_value = np.asarray(leaf_value, dtype=np.float64)
+        self.tree_roots = np.asarray(roots, dtype=np.int32)
+        self.max_depth = max(depths) if depths else 0
+        self.num_trees = len(roots)
+        self._prepare_traversal()
+
+    @classmethod
+    def from_model(cls, model):
+        """Compiles an ``LGBMClassifier`` (or a bare ``Booster``) into flat arrays."""
+        booster = getattr(model, "booster_", model)
+        return cls(booster.dump_model(), classes=getattr(model, "classes_", None))
+
+    def _parse_objective(self, objective):
+        tokens = objective.split()
+        self.objective = tokens[0] if tokens else "regression"
+        params = dict(token.split(":", 1) for token in tokens[1:] if ":" in token)
+        self.sigmoid = float(params.get("sigmoid", 1.0))
+        if self.objective not in ("multiclass", "softmax", "multiclassova", "ova", "binary",
+                                  "regression", "regression_l2", "regression_l1", "huber", "fair",
+                                  "quantile", "mape"):
+            raise NotImplementedError(f"Objective '{self.objective}' is not supported")
+
+    def _prepare_traversal(self):
+        # Derived arrays used by the hot loop: leaves read feature 0 and loop back to
+        # themselves, children are interleaved so one gather picks left or right, and
+        # the NaN direction of every numerical split is resolved ahead of time.
+        self._feature = np.where(self.split_feature >= 0, self.split_feature, 0).astype(np.intp)
+        self._children = np.empty(2 * len(self.split_feature), dtype=np.intp)
+        self._children[0::2] = self.left_child
+        self._children[1::2] = self.right_child
+        self._nan_left = np.where(self.missing_type == MISSING_NONE, 0.0 <= self.threshold, self.default_left)
+        self._has_zero_missing = bool(np.any((self.missing_type == MISSING_ZERO) & ~self.is_categorical))
+        self._has_categorical = bool(self.is_categorical.any())
+
+    def _fix_special(self, idx, value, go_left, may_have_nan):
+        if may_have_nan:
+            # ✅ NaN: default direction for NaN/Zero-missing splits, treated as 0.0 otherwise
+            nan = np.flatnonzero(np.isnan(value))
+            if nan.size:
+                go_left[nan] = self._nan_left.take(idx.take(nan))
+        if self._has_zero_missing:
+            zero = np.flatnonzero(np.abs(value) <= _ZERO_THRESHOLD)
+            if zero.size:
+                node = idx.take(zero)
+                tracked = (self.missing_type.take(node) == MISSING_ZERO) & ~self.is_categorical.take(node)
+                go_left[zero[tracked]] = self.default_left.take(node[tracked])
+        if self._has_categorical:
+            # ✅ Categorical: bitset membership; NaN and negative codes go right
+            cat = np.flatnonzero(self.is_categorical.take(idx))
+            if cat.size:
+                node = idx.take(cat)
+                cat_value = value.take(cat)
+                valid = ~np.isnan(cat_value)
+                code = np.where(valid, cat_value, 0.0).astype(np.int64)
+                word = code >> 5
+                in_range = valid & (code >= 0) & (word < self.cat_words.take(node))
+                bits = self.cat_bitset.take(self.cat_offset.take(node) + np.where(in_range, word, 0))
+                go_left[cat] = in_range & (((bits >> (code & 31).astype(np.uint32)) & 1) == 1)
+        return go_left
+
+    def predict_raw(self, X, chunk_rows=256):
+        """Returns raw scores (n_rows x num_tree_per_iteration) for a float64 feature matrix."""
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        raw = np.empty((len(X), self.num_tree_per_iteration), dtype=np.float64)
+        may_have_nan = bool(np.isnan(X).any())
+        tiny = (np.abs(X) <= _ZERO_THRESHOLD) & (X != 0.0)
+        if tiny.any():
+            X = np.where(tiny, 0.0, X)  # ✅ LightGBM's predictor drops |value| <= kZeroThreshold, i.e. reads 0.0
+
+        # Rows are scored in cache-sized chunks; the gathers below are random-access
+        for start in range(0, len(X), chunk_rows):
+            raw[start:start + chunk_rows] = self._predict_chunk(X[start:start + chunk_rows], may_have_nan)
+        return raw
+
+    def _predict_chunk(self, X, may_have_nan):
+        n, num_features = X.shape
+        flat_X = X.ravel()
+
+        # ✅ Level-by-level traversal of every (row, tree) pair at once
+        idx = np.tile(self.tree_roots.astype(np.intp), n)
+        row_offset = np.repeat(np.arange(n, dtype=np.intp) * num_features, self.num_trees)
+        for _ in range(self.max_depth):
+            value = flat_X.take(row_offset + self._feature.take(idx))
+            go_left = value <= self.threshold.take(idx)
+            go_left = self._fix_special(idx, value, go_left, may_have_nan)
+            idx = self._children.take(2 * idx + ~go_left)
+
+        k = self.num_tree_per_iteration
+        leaf = self.leaf_value.take(idx).reshape(n, -1, k)
+        raw = leaf.sum(axis=1)
+        if self.average_output:
+            raw /= leaf.shape[1]
+        return raw
+
+    def predict_proba(self, X):
+        """Returns the same output as ``Booster.predict``: class probabilities, or a
+        1-D array for binary and regression objectives."""
+        raw = self.predict_raw(X)
+        if self.objective in ("multiclass", "softmax"):
+            exp = np.exp(raw - raw.max(axis=1, keepdims=True))
+            return exp / exp.sum(axis=1, keepdims=True)
+        if self.objective in ("multiclassova", "ova"):
+            return 1.0 / (1.0 + np.exp(-self.sigmoid * raw))
+        if self.objective == "binary":
+            return 1.0 / (1.0 + np.exp(-self.sigmoid * raw[:, 0]))
+        return raw[:, 0]
+
+    def predict(self, X):
+        """Returns class labels the same way ``LGBMClassifier.predict`` does."""
+        proba = self.predict_proba(X)
+        if self.classes is None:
+            raise ValueError("Class labels are unknown; compile from an LGBMClassifier")
+        if proba.ndim == 1:
+            return self.classes[(proba > 0.5).astype(int)]
+        return self.classes[np.argmax(proba, axis=1)]
+
+
+def sample_feature_matrix(model, n, seed=0):
+    """Generates a float64 feature matrix covering the model's observed feature ranges,
+    including NaNs, unseen category codes and values exactly on split thresholds."""
+    booster = getattr(model, "booster_", model)
+    dump = booster.dump_model()
+    rng = np.random.default_rng(seed)
+    X = np.empty((n, len(dump["feature_names"])), dtype=np.float64)
+
+    thresholds = {}
+
+    def collect(node):
+        if "split_index" in node:
+            if node["decision_type"] == "<=":
+                thresholds.setdefault(node["split_feature"], []).append(float(node["threshold"]))
+            collect(node["left_child"])
+            collect(node["right_child"])
+
+    for tree in dump["tree_info"]:
+        collect(tree["tree_structure"])
+
+    for j, name in enumerate(dump["feature_names"]):
+        info = dump["feature_infos"].get(name, {})
+        values = [v for v in info.get("values", []) if v >= 0]
+        if values:
+            column = rng.choice(values + [max(values) + 1], size=n).astype(np.float64)
+        else:
+            low, high = float(info.get("min_value", 0)), float(info.get("max_value", 1))
+            span = (high - low) or 1.0
+            column = rng.uniform(low - 0.1 * span, high + 0.1 * span, size=n)
+            if thresholds.get(j):
+                on_split = rng.random(n) < 0.1
+                column[on_split] = rng.choice(thresholds[j], size=on_split.sum())
+        column[rng.random(n) < 0.02] = np.nan
+        X[:, j] = column
+    return X
+
+
+def check_parity(model, X, engine=None, atol=1e-9):
+    """Compares the compiled engine against the LightGBM booster on ``X``.
+
+    Returns ``(ok, max_abs_probability_diff)`` where ``ok`` requires identical labels
+    and probabilities within ``atol``.
+    """
+    booster = getattr(model, "booster_", model)
+    engine = engine or CompiledEnsemble.from_model(model)
+    expected = booster.predict(X)
+    actual = engine.predict_proba(X)
+    max_diff = float(np.max(np.abs(expected - actual))) if len(X) else 0.0
+    if engine.classes is not None:
+        if expected.ndim == 1:
+            expected_labels = engine.classes[(expected > 0.5).astype(int)]
+        else:
+            expected_labels = engine.classes[np.argmax(expected, axis=1)]
+        labels_match = bool(np.array_equal(expected_labels, engine.predict(X)))
+    else:
+        labels_match = max_diff <= atol
+    return labels_match and max_diff <= atol, max_diff
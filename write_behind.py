@@ -0,0 +1,175 @@
+import queue
+import threading
+import time
+
+
+class WriteBehindWriter:
+    """Buffers scored rows in a bounded in-process queue and persists them in the background.
+
+    A writer thread drains the queue and calls ``flush_fn(rows)`` (a multi-row INSERT +
+    commit) every ``flush_rows`` rows or ``flush_interval_ms`` milliseconds, whichever
+    comes first. When the queue is full, ``submit()`` blocks for up to ``put_timeout``
+    seconds (backpressure) and then raises ``queue.Full``; ``submit_many()`` admits a
+    batch all or none, so a caller that sees the error knows none of it was written. Failed flushes are retried
+    ``max_retries`` times with backoff before the rows are counted as dropped and passed
+    to ``on_drop(rows)``.
+    ``close()`` flushes everything still queued.
+    """
+
+    def __init__(self, flush_fn, max_queue_size=10000, flush_rows=500, flush_interval_ms=200,
+                 put_timeout=5.0, max_retries=3, retry_backoff_ms=100, on_drop=None):
+        self.flush_fn = flush_fn
+        self.on_drop = on_drop
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.put_timeout = put_timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff_ms / 1000.0
+        self.max_queue_size = max_queue_size
+        self._queue = queue.Queue()  # Bounded by _queued, which submit_many() reserves under the lock
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._space = threading.Condition(self._lock)
+        self._queued = 0  # Rows admitted but not yet taken by the writer thread
+        self._pending = 0  # Rows submitted but not yet flushed (or dropped)
+        self._stats = {
+            "rows_submitted": 0,
+            "rows_written": 0,
+            "rows_dropped": 0,
+            "flushes": 0,
+            "failed_flushes": 0,
+            "flush_retries": 0,
+            "backpressure_waits": 0,
+            "rejected_rows": 0,
+            "last_error": None,
+        }
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def submit(self, row):
+        """Queues one row for persistence, blocking while the queue is full."""
+        self.submit_many([row])
+
+    def submit_many(self, rows):
+        """Queues many rows for persistence, all or none: waits up to ``put_timeout`` until the
+        queue has room for every row, then raises ``queue.Full`` without queueing any of them.
+        A batch larger than the whole queue is admitted once the queue is empty."""
+        rows = list(rows)
+
+        def has_room():
+            return self._stopped or self._queued == 0 or self._queued + len(rows) <= self.max_queue_size
+
+        with self._space:
+            if not self._stopped and not has_room():
+                self._stats["backpressure_waits"] += 1
+                if not self._space.wait_for(has_room, timeout=self.put_timeout):
+                    self._stats["rejected_rows"] += len(rows)
+                    raise queue.Full
+            if self._stopped:
+                raise RuntimeError("Write-behind writer is stopped")
+            # ✅ Rows are queued under the lock, so a batch is never split and never lands
+            # behind the shutdown sentinel
+            self._queued += len(rows)
+            self._pending += len(rows)
+            self._stats["rows_submitted"] += len(rows)
+            for row in rows:
+                self._queue.put_nowait(row)
+
+    def wait_until_flushed(self, timeout=None):
+        """Blocks until every submitted row has been flushed or dropped."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout=timeout)
+
+    def stats(self):
+        """Returns counters plus the current queue depth."""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["pending_rows"] = self._pending
+            snapshot["queue_depth"] = self._queued
+        return snapshot
+
+    def close(self, timeout=None):
+        """Stops accepting rows and flushes everything still queued."""
+        with self._space:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._queue.put_nowait(None)
+            self._space.notify_all()
+        self._thread.join(timeout)
+
+    def _take(self, count):
+        """Frees queue capacity for rows the writer thread has taken."""
+        with self._space:
+            self._queued -= count
+            self._space.notify_all()
+
+    def _collect(self):
+        """Waits for the next batch: up to flush_rows rows or flush_interval after the first row."""
+        first = self._queue.get()
+        if first is None:
+            return [], True
+        self._take(1)
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.flush_rows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            self._take(1)
+            batch.append(item)
+        return batch, False
+
+    def _flush(self, batch):
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.flush_fn(batch)
+                with self._lock:
+                    self._stats["flushes"] += 1
+                    self._stats["rows_written"] += len(batch)
+                return
+            except Exception as e:
+                with self._lock:
+                    self._stats["last_error"] = str(e)
+                    if attempt < self.max_retries:
+                        self._stats["flush_retries"] += 1
+                if attempt < self.max_retries:
+                    time.sleep(self.retry_backoff * (2 ** attempt))
+
+        with self._lock:
+            self._stats["failed_flushes"] += 1
+            self._stats["rows_dropped"] += len(batch)
+        print(f"🚨 Write-behind flush failed, dropped {len(batch)} rows: {self._stats['last_error']}")
+        if self.on_drop is not None:
+            try:
+                self.on_drop(batch)
+            except Exception as e:
+                print(f"🚨 Write-behind on_drop failed: {e}")
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._collect()
+            if stopping:
+                # ✅ Drain whatever is left so shutdown loses nothing
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not None:
+                        self._take(1)
+                        batch.append(item)
+            for start in range(0, len(batch), self.flush_rows):
+                chunk = batch[start:start + self.flush_rows]
+                self._flush(chunk)
+                with self._idle:
+                    self._pending -= len(chunk)
+                    self._idle.notify_all()